@@ -1,5 +1,17 @@
 # Description: Basic data structures necessary for the project.
 
+import os
+import pickle
+import struct
+from bisect import bisect_left, bisect_right
+from concurrent.futures import ProcessPoolExecutor
+from collections.abc import KeysView, ValuesView, ItemsView
+
+try:
+    import numpy as np
+except ImportError:                 # NumPy is optional; batch hashing falls back to the scalar functions.
+    np = None
+
 
 # -------------- Used by both HashMaps (SC & OA)  -------------- #
 
@@ -73,6 +85,90 @@ class DynamicArray:
         return len(self._data)
 
 
+# Table capacities used by automatic growth: primes that roughly double, each the first prime above twice
+# the one before, up to past 2 ** 40.
+PRIME_CAPACITIES = (
+    2, 5, 11, 23, 47, 97, 197, 397, 797, 1597, 3203, 6421, 12853, 25717, 51437, 102877,
+    205759, 411527, 823117, 1646237, 3292489, 6584983, 13169977, 26339969, 52679969,
+    105359939, 210719881, 421439783, 842879579, 1685759167, 3371518343, 6743036717,
+    13486073473, 26972146961, 53944293929, 107888587883, 215777175787, 431554351609,
+    863108703229, 1726217406467,
+)
+
+# Miller-Rabin witnesses that decide primality exactly for every number below 3.3 * 10 ** 24.
+PRIME_WITNESSES = (2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37)
+
+
+def is_prime(number: int) -> bool:
+    """
+    Determine if given integer is a prime number. Small numbers use trial division, larger ones
+    a Miller-Rabin test with the PRIME_WITNESSES bases.
+    """
+    if number < 2:
+        return False
+
+    for witness in PRIME_WITNESSES:
+        if number % witness == 0:
+            return number == witness
+
+    if number < 1 << 20:
+        factor = 41
+        while factor * factor <= number:
+            if number % factor == 0:
+                return False
+            factor += 2
+        return True
+
+    odd, shift = number - 1, 0
+    while odd % 2 == 0:
+        odd, shift = odd // 2, shift + 1
+
+    for witness in PRIME_WITNESSES:
+        x = pow(witness, odd, number)
+        if x == 1 or x == number - 1:
+            continue
+        for _ in range(shift - 1):
+            x = x * x % number
+            if x == number - 1:
+                break
+        else:
+            return False
+
+    return True
+
+
+def next_prime_capacity(capacity: int) -> int:
+    """
+    Return the smallest prime that is at least capacity.
+    Each ladder prime is the first prime above twice the one before, so a request from twice one ladder
+    prime up to the next, such as the doubled capacity of automatic growth, is answered from
+    PRIME_CAPACITIES by binary search. Other requests search upward from capacity.
+    """
+    index = bisect_left(PRIME_CAPACITIES, capacity)
+    if index < len(PRIME_CAPACITIES) and (index == 0 or capacity >= 2 * PRIME_CAPACITIES[index - 1]):
+        return PRIME_CAPACITIES[index]
+
+    if capacity <= 2:
+        return 2
+
+    capacity |= 1
+    while not is_prime(capacity):
+        capacity += 2
+    return capacity
+
+
+def to_list(items) -> list:
+    """
+    Return the items of a DynamicArray, list, tuple or any other iterable as a list.
+    Lists and tuples are returned as they are, without copying.
+    """
+    if isinstance(items, (list, tuple)):
+        return items
+    if isinstance(items, DynamicArray):
+        return [items[index] for index in range(items.length())]
+    return list(items)
+
+
 def hash_function_1(key: str) -> int:
     """Sample Hash function #1 to be used with HashMap implementation"""
     hash = 0
@@ -91,6 +187,279 @@ def hash_function_2(key: str) -> int:
     return hash
 
 
+# ---------------- Seeded hash function registry ---------------- #
+
+MASK_64 = (1 << 64) - 1
+
+FNV_OFFSET_BASIS = 0xcbf29ce484222325
+FNV_PRIME = 0x100000001b3
+
+
+def _key_bytes(key) -> bytes:
+    """Return the bytes that the registry hash functions read for a key."""
+    if isinstance(key, str):
+        return key.encode('utf-8', 'surrogatepass')
+    if isinstance(key, (bytes, bytearray)):
+        return bytes(key)
+    return str(key).encode('utf-8', 'surrogatepass')
+
+
+def make_fnv1a(seed: int = None):
+    """
+    Return a 64-bit FNV-1a hash function. The seed is folded into the offset basis.
+    Fast and non-cryptographic; it spreads keys far better than hash_function_1 and hash_function_2.
+    """
+    basis = (FNV_OFFSET_BASIS ^ (seed or 0)) & MASK_64
+
+    def fnv1a(key) -> int:
+        hash = basis
+        for byte in _key_bytes(key):
+            hash = ((hash ^ byte) * FNV_PRIME) & MASK_64
+        return hash
+
+    return fnv1a
+
+
+def _rotl(value: int, bits: int) -> int:
+    """Rotate a 64-bit integer left by the given number of bits."""
+    return ((value << bits) | (value >> (64 - bits))) & MASK_64
+
+
+def make_siphash(seed: int = None):
+    """
+    Return a SipHash-2-4 hash function keyed by the low 128 bits of seed.
+    Without a seed, a random key is drawn so that colliding keys cannot be precomputed.
+    """
+    if seed is None:
+        seed = int.from_bytes(os.urandom(16), 'little')
+
+    k0, k1 = seed & MASK_64, (seed >> 64) & MASK_64
+    init = (k0 ^ 0x736f6d6570736575, k1 ^ 0x646f72616e646f6d,
+            k0 ^ 0x6c7967656e657261, k1 ^ 0x7465646279746573)
+
+    def siphash(key) -> int:
+        data = _key_bytes(key)
+        v0, v1, v2, v3 = init
+
+        # Pad the final block with zeros and the message length in the top byte.
+        tail = len(data) & ~7
+        blocks = [int.from_bytes(data[i:i + 8], 'little') for i in range(0, tail, 8)]
+        blocks.append(int.from_bytes(data[tail:], 'little') | ((len(data) & 0xff) << 56))
+
+        for m in blocks:
+            v3 ^= m
+            for _ in range(2):
+                v0 = (v0 + v1) & MASK_64; v1 = _rotl(v1, 13); v1 ^= v0; v0 = _rotl(v0, 32)
+                v2 = (v2 + v3) & MASK_64; v3 = _rotl(v3, 16); v3 ^= v2
+                v0 = (v0 + v3) & MASK_64; v3 = _rotl(v3, 21); v3 ^= v0
+                v2 = (v2 + v1) & MASK_64; v1 = _rotl(v1, 17); v1 ^= v2; v2 = _rotl(v2, 32)
+            v0 ^= m
+
+        v2 ^= 0xff
+        for _ in range(4):
+            v0 = (v0 + v1) & MASK_64; v1 = _rotl(v1, 13); v1 ^= v0; v0 = _rotl(v0, 32)
+            v2 = (v2 + v3) & MASK_64; v3 = _rotl(v3, 16); v3 ^= v2
+            v0 = (v0 + v3) & MASK_64; v3 = _rotl(v3, 21); v3 ^= v0
+            v2 = (v2 + v1) & MASK_64; v1 = _rotl(v1, 17); v1 ^= v2; v2 = _rotl(v2, 32)
+
+        return v0 ^ v1 ^ v2 ^ v3
+
+    # Record the key actually used, so a table built with a random key can be reopened.
+    siphash.seed = seed
+    return siphash
+
+
+def mix_hash(hash: int) -> int:
+    """
+    Return the 64-bit MurmurHash3 finalizer of a hash. Every input bit affects every output bit,
+    so weak hashes can be indexed by their low bits in power-of-two tables.
+    """
+    hash &= MASK_64
+    hash = ((hash ^ (hash >> 33)) * 0xff51afd7ed558ccd) & MASK_64
+    hash = ((hash ^ (hash >> 33)) * 0xc4ceb9fe1a85ec53) & MASK_64
+    return hash ^ (hash >> 33)
+
+
+def mixed_hash_function(function):
+    """Return a hash function that applies mix_hash to the result of function."""
+    def mixed(key) -> int:
+        return mix_hash(function(key))
+
+    return mixed
+
+
+# Registered hash functions by name. Each factory takes a seed (or None) and returns a hash function.
+HASH_FUNCTIONS = {
+    'hash_function_1': lambda seed=None: hash_function_1,
+    'hash_function_2': lambda seed=None: hash_function_2,
+    'fnv1a': make_fnv1a,
+    'siphash': make_siphash,
+}
+
+
+def register_hash_function(name: str, factory) -> None:
+    """Register a hash function factory under name. The factory takes a seed (or None)."""
+    HASH_FUNCTIONS[name] = factory
+
+
+def get_hash_function(name: str, seed: int = None):
+    """
+    Return the hash function registered under name, built with the given seed.
+    The function's hash_name and seed attributes record how it was built.
+    """
+    if name not in HASH_FUNCTIONS:
+        raise ValueError('unknown hash function: ' + repr(name))
+
+    function = HASH_FUNCTIONS[name](seed)
+    if function not in (hash_function_1, hash_function_2):
+        function.hash_name = name
+        if getattr(function, 'seed', None) is None:
+            function.seed = seed
+    return function
+
+
+def hash_function_id(function) -> tuple:
+    """
+    Return the (name, seed) pair that get_hash_function rebuilds function from.
+    Raises ValueError for a hash function that did not come from the registry.
+    """
+    if function is hash_function_1 or function is hash_function_2:
+        return function.__name__, None
+
+    name = getattr(function, 'hash_name', None)
+    if name is None:
+        raise ValueError('hash function is not registered: ' + repr(function))
+    return name, function.seed
+
+
+def resolve_hash_function(function, seed: int = None):
+    """Return function itself if it is callable, otherwise look it up in the registry by name."""
+    if callable(function):
+        return function
+    return get_hash_function(function, seed)
+
+
+# Batches smaller than this are hashed with the scalar functions, where NumPy setup costs more than it saves.
+VECTORIZE_MIN_BATCH = 64
+
+# Longest key the vectorized hashes accept. Longer keys could overflow int64 in hash_function_2.
+VECTORIZE_MAX_KEY_LENGTH = 1 << 21
+
+
+def _code_points(keys: list):
+    """
+    Return the code points of all keys concatenated into one int64 array, along with the start
+    offset and length of each key. Return None if a key is not a string or is too long.
+    """
+    try:
+        data = ''.join(keys).encode('utf-32-le', 'surrogatepass')
+    except TypeError:
+        return None
+
+    lengths = np.fromiter(map(len, keys), dtype=np.int64, count=len(keys))
+    if lengths.size and lengths.max() > VECTORIZE_MAX_KEY_LENGTH:
+        return None
+
+    codes = np.frombuffer(data, dtype=np.uint32).astype(np.int64)
+    starts = np.zeros(len(keys), dtype=np.int64)
+    np.cumsum(lengths[:-1], out=starts[1:])
+    return codes, starts, lengths
+
+
+def _segment_sums(values, starts, lengths) -> list:
+    """Return the sum of values over each [start, start + length) segment as a list of ints."""
+    totals = np.zeros(values.size + 1, dtype=np.int64)
+    np.cumsum(values, out=totals[1:])
+
+    # int64 wraparound in the running total cancels out in the difference.
+    return (totals[starts + lengths] - totals[starts]).tolist()
+
+
+def hash_function_1_many(keys: list) -> list:
+    """Vectorized hash_function_1 over a list of string keys. Results match hash_function_1 exactly."""
+    if np is None or len(keys) < VECTORIZE_MIN_BATCH:
+        return list(map(hash_function_1, keys))
+
+    split = _code_points(keys)
+    if split is None:
+        return list(map(hash_function_1, keys))
+
+    codes, starts, lengths = split
+    return _segment_sums(codes, starts, lengths)
+
+
+def hash_function_2_many(keys: list) -> list:
+    """Vectorized hash_function_2 over a list of string keys. Results match hash_function_2 exactly."""
+    if np is None or len(keys) < VECTORIZE_MIN_BATCH:
+        return list(map(hash_function_2, keys))
+
+    split = _code_points(keys)
+    if split is None:
+        return list(map(hash_function_2, keys))
+
+    # Weight each code point by its 1-based position within its own key.
+    codes, starts, lengths = split
+    weights = np.arange(1, codes.size + 1, dtype=np.int64) - np.repeat(starts, lengths)
+    return _segment_sums(codes * weights, starts, lengths)
+
+
+# Scalar hash functions that have a vectorized batch version.
+_VECTORIZED_HASHES = {
+    hash_function_1: hash_function_1_many,
+    hash_function_2: hash_function_2_many,
+}
+
+
+def hash_many(function, keys: list) -> list:
+    """
+    Hash a list of keys with the given hash function, using its vectorized version when one exists.
+    """
+    vectorized = _VECTORIZED_HASHES.get(function)
+    if vectorized is not None:
+        return vectorized(keys)
+    return list(map(function, keys))
+
+
+# Batches smaller than this are hashed in the calling process, where starting a pool costs more than it saves.
+PARALLEL_MIN_BATCH = 1 << 16
+
+
+def _hash_range(name: str, seed: int, mixed: bool, keys: list) -> list:
+    """Hash one range of keys in a worker process with the hash function registered under name."""
+    hashes = hash_many(get_hash_function(name, seed), keys)
+    if mixed:
+        return list(map(mix_hash, hashes))
+    return hashes
+
+
+def hash_many_parallel(function, keys: list, workers: int = None, mixed: bool = False) -> list:
+    """
+    Hash a list of keys in a pool of worker processes (os.cpu_count() by default), one contiguous range
+    of keys per worker. Workers rebuild the hash function from its registry name and seed, so a batch
+    smaller than PARALLEL_MIN_BATCH, a single worker or an unregistered function hashes in this process.
+    If mixed is True, mix_hash is applied to every hash.
+    """
+    workers = workers or os.cpu_count() or 1
+
+    try:
+        name, seed = hash_function_id(function)
+    except ValueError:
+        name = None
+
+    if name is None or workers == 1 or len(keys) < PARALLEL_MIN_BATCH:
+        hashes = hash_many(function, keys)
+        if mixed:
+            return list(map(mix_hash, hashes))
+        return hashes
+
+    size = -(-len(keys) // workers)
+    ranges = [keys[start:start + size] for start in range(0, len(keys), size)]
+
+    with ProcessPoolExecutor(len(ranges)) as pool:
+        parts = pool.map(_hash_range, [name] * len(ranges), [seed] * len(ranges), [mixed] * len(ranges), ranges)
+        return [hash for part in parts for hash in part]
+
+
 # --------- For use in Separate Chaining (SC) HashMap  --------- #
 
 class SLNode:
@@ -98,16 +467,211 @@ class SLNode:
     Singly Linked List node for use in a hash map
     """
 
-    def __init__(self, key: str, value: object, next: "SLNode" = None) -> None:
-        """Initialize node given a key and value."""
+    # Recency link and byte cost used by hash_map_cache.CacheMap, which also uses next, and the expiry
+    # time and timer wheel tick used by hash_map_ttl.ExpiringHashMap.
+    prev = None
+    cost = 0
+    deadline = None
+    wheel_tick = None
+
+    def __init__(self, key: str, value: object, next: "SLNode" = None, hash: int = 0) -> None:
+        """Initialize node given a key, value and the full hash of the key."""
         self.key = key
         self.value = value
         self.next = next
+        self.hash = hash
 
     def __str__(self) -> str:
         """Override string method to provide more readable output."""
         return '(' + str(self.key) + ': ' + str(self.value) + ')'
 
+    def __repr__(self) -> str:
+        """Show nodes the same way inside an overflow array."""
+        return self.__str__()
+
+
+# Compact chaining buckets. A bucket is None when empty, the SLNode itself when it holds one entry, a list of
+# two or more SLNodes (an overflow array), or a SortedBucket once a chain reaches TREEIFY_THRESHOLD nodes.
+# Nodes keep their cached hashes; next is unused.
+
+# An overflow array this long is converted to a SortedBucket; a SortedBucket this short goes back to a list.
+TREEIFY_THRESHOLD = 8
+UNTREEIFY_THRESHOLD = 6
+
+
+class SortedBucket:
+    """
+    Bucket for a long chain. Nodes are kept sorted by cached hash, then key, in parallel lists of hashes,
+    keys and nodes, and are found by binary search. If two keys with an equal hash cannot be ordered,
+    keys within a run of equal hashes are scanned instead.
+    Supported methods are: find, add, discard, copy, length
+    """
+
+    def __init__(self, nodes: list = ()) -> None:
+        """Initialize a sorted bucket holding the given nodes."""
+        self.ordered = True
+        try:
+            nodes = sorted(nodes, key=lambda node: (node.hash, node.key))
+        except TypeError:
+            nodes = sorted(nodes, key=lambda node: node.hash)
+            self.ordered = False
+
+        self.nodes = nodes
+        self.hashes = [node.hash for node in nodes]
+        self.keys = [node.key for node in nodes]
+
+    def __str__(self) -> str:
+        """Override string method to provide more readable output."""
+        return 'SB ' + str(self.nodes)
+
+    def _index(self, key: str, hash: int) -> int:
+        """Return the position of the node with matching hash and key, or -1 if no match."""
+        hashes, keys = self.hashes, self.keys
+        low = bisect_left(hashes, hash)
+        high = bisect_right(hashes, hash, low)
+
+        if self.ordered and high - low > 1:
+            try:
+                position = bisect_left(keys, key, low, high)
+                return position if position < high and keys[position] == key else -1
+            except TypeError:
+                pass
+
+        for position in range(low, high):
+            if keys[position] == key:
+                return position
+        return -1
+
+    def find(self, key: str, hash: int) -> SLNode:
+        """Return node with matching hash and key, or None if no match."""
+        position = self._index(key, hash)
+        return self.nodes[position] if position >= 0 else None
+
+    def add(self, node: SLNode) -> None:
+        """Insert node in sorted position, without a duplicate check."""
+        hashes, keys = self.hashes, self.keys
+        position = bisect_right(hashes, node.hash)
+
+        if self.ordered:
+            try:
+                position = bisect_left(keys, node.key, bisect_left(hashes, node.hash, 0, position), position)
+            except TypeError:
+                self.ordered = False
+
+        hashes.insert(position, node.hash)
+        keys.insert(position, node.key)
+        self.nodes.insert(position, node)
+
+    def discard(self, key: str, hash: int) -> SLNode:
+        """Remove node with matching hash and key. Return the removed node, or None if no match."""
+        position = self._index(key, hash)
+        if position < 0:
+            return None
+
+        del self.hashes[position], self.keys[position]
+        return self.nodes.pop(position)
+
+    def copy(self) -> "SortedBucket":
+        """Return a new sorted bucket holding the same nodes."""
+        bucket = SortedBucket()
+        bucket.ordered = self.ordered
+        bucket.nodes, bucket.hashes, bucket.keys = self.nodes.copy(), self.hashes.copy(), self.keys.copy()
+        return bucket
+
+    def length(self) -> int:
+        """Return the number of nodes in the bucket."""
+        return len(self.nodes)
+
+
+def bucket_find(bucket, key: str, hash: int) -> SLNode:
+    """
+    Return the node of the bucket with matching cached hash and key, or None if no match.
+    Keys are only compared for nodes whose cached hash is equal.
+    """
+    if bucket is None:
+        return None
+
+    if type(bucket) is SLNode:
+        return bucket if bucket.hash == hash and bucket.key == key else None
+
+    if type(bucket) is list:
+        for node in bucket:
+            if node.hash == hash and node.key == key:
+                return node
+        return None
+
+    return bucket.find(key, hash)
+
+
+def bucket_add(bucket, node: SLNode):
+    """
+    Add node to the bucket without a duplicate check and return the bucket to store in its place.
+    An overflow array or sorted bucket is added to in place; an overflow array that reaches
+    TREEIFY_THRESHOLD nodes is replaced by a SortedBucket.
+    """
+    if bucket is None:
+        return node
+
+    if type(bucket) is SLNode:
+        return [bucket, node]
+
+    if type(bucket) is list:
+        bucket.append(node)
+        return SortedBucket(bucket) if len(bucket) >= TREEIFY_THRESHOLD else bucket
+
+    bucket.add(node)
+    return bucket
+
+
+def bucket_discard(bucket, key: str, hash: int) -> tuple:
+    """
+    Remove the node with matching cached hash and key from the bucket.
+    Return a tuple (bucket to store in its place, removed node or None). An overflow array left with one
+    node collapses back to the node itself, and a sorted bucket left with UNTREEIFY_THRESHOLD nodes goes
+    back to an overflow array.
+    """
+    if bucket is None:
+        return None, None
+
+    if type(bucket) is SLNode:
+        if bucket.hash == hash and bucket.key == key:
+            return None, bucket
+        return bucket, None
+
+    if type(bucket) is list:
+        for position, node in enumerate(bucket):
+            if node.hash == hash and node.key == key:
+                del bucket[position]
+                return (bucket[0] if len(bucket) == 1 else bucket), node
+        return bucket, None
+
+    node = bucket.discard(key, hash)
+    if node is not None and bucket.length() <= UNTREEIFY_THRESHOLD:
+        return bucket.nodes, node
+    return bucket, node
+
+
+def bucket_nodes(bucket):
+    """Return the nodes of the bucket as a tuple or list, for iteration."""
+    if bucket is None:
+        return ()
+
+    if type(bucket) is SLNode:
+        return (bucket,)
+
+    if type(bucket) is list:
+        return bucket
+
+    return bucket.nodes
+
+
+def bucket_copy(bucket):
+    """Return a bucket holding the same nodes that can be changed without affecting this one."""
+    if type(bucket) is list or type(bucket) is SortedBucket:
+        return bucket.copy()
+
+    return bucket
+
 
 class LinkedListIterator:
     """
@@ -136,7 +700,7 @@ class LinkedListIterator:
 class LinkedList:
     """
     Class implementing a Singly Linked List
-    Supported methods are: insert, remove, contains, length, iterator
+    Supported methods are: insert, insert_node, remove, contains, length, head, iterator
     """
 
     def __init__(self) -> None:
@@ -163,20 +727,27 @@ class LinkedList:
         """Return an iterator for the list, starting at the head."""
         return LinkedListIterator(self._head)
 
-    def insert(self, key: str, value: object) -> None:
+    def insert(self, key: str, value: object, hash: int = 0) -> None:
         """Insert new node at front of the list."""
-        self._head = SLNode(key, value, self._head)
+        self._head = SLNode(key, value, self._head, hash)
         self._size += 1
 
-    def remove(self, key: str) -> bool:
+    def insert_node(self, node: SLNode) -> None:
+        """Link an existing node in at the front of the list."""
+        node.next = self._head
+        self._head = node
+        self._size += 1
+
+    def remove(self, key: str, hash: int = None) -> bool:
         """
         Remove first node with matching key.
+        If hash is given, nodes with a different cached hash are skipped without comparing keys.
         Return True if removal was successful, False otherwise.
         """
         previous, node = None, self._head
         while node:
 
-            if node.key == key:
+            if (hash is None or node.hash == hash) and node.key == key:
                 if previous:
                     previous.next = node.next
                 else:
@@ -187,11 +758,21 @@ class LinkedList:
             previous, node = node, node.next
         return False
 
-    def contains(self, key: str) -> SLNode:
-        """Return node with matching key, or None if no match"""
+    def contains(self, key: str, hash: int = None) -> SLNode:
+        """
+        Return node with matching key, or None if no match
+        If hash is given, nodes with a different cached hash are skipped without comparing keys.
+        """
         node = self._head
+        if hash is None:
+            while node:
+                if node.key == key:
+                    return node
+                node = node.next
+            return node
+
         while node:
-            if node.key == key:
+            if node.hash == hash and node.key == key:
                 return node
             node = node.next
         return node
@@ -200,15 +781,28 @@ class LinkedList:
         """Return the length of the list."""
         return self._size
 
+    def head(self) -> SLNode:
+        """Return the first node of the list, or None if the list is empty."""
+        return self._head
+
 
 # ---------- For use in Open Addressing (OA) HashMap  ---------- #
 
 class HashEntry:
 
-    def __init__(self, key: str, value: object) -> None:
-        """Initialize an entry for use in a hash map."""
+    # Recency links and byte cost used by hash_map_cache.CacheMap, and the expiry time and timer wheel
+    # tick used by hash_map_ttl.ExpiringHashMap.
+    prev = None
+    next = None
+    cost = 0
+    deadline = None
+    wheel_tick = None
+
+    def __init__(self, key: str, value: object, hash: int = 0) -> None:
+        """Initialize an entry for use in a hash map, keeping the full hash of the key."""
         self.key = key
         self.value = value
+        self.hash = hash
 
         # Set this value to True when you "delete" a HashEntry
         self.is_tombstone = False
@@ -217,3 +811,201 @@ class HashEntry:
         """Override string method to provide more readable output."""
         return f"K: {self.key} V: {self.value} TS: {self.is_tombstone}"
 
+
+# ---------------- Binary records and snapshots ---------------- #
+
+# Type tag written before every encoded value.
+VALUE_NONE, VALUE_BOOL, VALUE_INT, VALUE_FLOAT, VALUE_STR, VALUE_BYTES, VALUE_PICKLE = range(7)
+
+_FLOAT = struct.Struct('<d')
+
+
+def encode_value(value) -> bytes:
+    """
+    Return value as a tag byte followed by its payload. None, bool, int, float, str and bytes are
+    written directly; anything else is pickled, so only load stored maps from trusted files.
+    """
+    if value is None:
+        return bytes((VALUE_NONE,))
+    if value is True or value is False:
+        return bytes((VALUE_BOOL, value))
+    if type(value) is int:
+        return bytes((VALUE_INT,)) + value.to_bytes(value.bit_length() // 8 + 1, 'little', signed=True)
+    if type(value) is float:
+        return bytes((VALUE_FLOAT,)) + _FLOAT.pack(value)
+    if type(value) is str:
+        return bytes((VALUE_STR,)) + value.encode('utf-8', 'surrogatepass')
+    if type(value) is bytes:
+        return bytes((VALUE_BYTES,)) + value
+    return bytes((VALUE_PICKLE,)) + pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+
+
+def decode_value(data) -> object:
+    """Return the value encoded in data (bytes or a memoryview) by encode_value."""
+    tag = data[0]
+    if tag == VALUE_STR:
+        return str(data[1:], 'utf-8', 'surrogatepass')
+    if tag == VALUE_INT:
+        return int.from_bytes(data[1:], 'little', signed=True)
+    if tag == VALUE_NONE:
+        return None
+    if tag == VALUE_BOOL:
+        return data[1] == 1
+    if tag == VALUE_FLOAT:
+        return _FLOAT.unpack_from(data, 1)[0]
+    if tag == VALUE_BYTES:
+        return bytes(data[1:])
+    if tag == VALUE_PICKLE:
+        return pickle.loads(data[1:])
+    raise ValueError('unknown value tag: ' + str(tag))
+
+
+# Layout of dump/load snapshot files (little-endian).
+SNAPSHOT_MAGIC = b'HMSN'
+SNAPSHOT_VERSION = 1
+
+# Header flags: slot positions and cached hashes are saved; the table was built in power-of-two mode.
+SNAPSHOT_LAYOUT, SNAPSHOT_POWER_OF_TWO = 1, 2
+
+# magic, version, flags, capacity, size, max probe, number of slot records
+SNAPSHOT_HEADER = struct.Struct('<4sHHQQQQ')
+
+# slot index, cached hash and tombstone flag, written before each record in layout mode
+SNAPSHOT_SLOT = struct.Struct('<QQB')
+
+# Bytes gathered before each write to the file.
+SNAPSHOT_CHUNK = 1 << 20
+
+_U32 = struct.Struct('<I')
+
+
+def dump_snapshot(fileobj, function, flags: int, capacity: int, size: int, max_probe: int,
+                  count: int, slots) -> None:
+    """
+    Write a snapshot to a binary file object: the header, the hash function's registry name and seed,
+    then count slot records. slots yields (index, hash, key, value, tombstone) tuples; index, hash and
+    tombstone are only written with SNAPSHOT_LAYOUT, and a tombstone has no key or value record.
+    Records are length-prefixed encode_value payloads, gathered into SNAPSHOT_CHUNK sized writes.
+    """
+    try:
+        name, seed = hash_function_id(function)
+    except ValueError:
+        name = seed = None
+
+    buffer = bytearray(SNAPSHOT_HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION, flags, capacity, size,
+                                            max_probe, count))
+
+    def add_record(value) -> None:
+        data = encode_value(value)
+        buffer.extend(_U32.pack(len(data)))
+        buffer.extend(data)
+
+    add_record(name)
+    add_record(seed)
+    layout = flags & SNAPSHOT_LAYOUT
+
+    for index, hash, key, value, tombstone in slots:
+        if layout:
+            buffer.extend(SNAPSHOT_SLOT.pack(index, hash, tombstone))
+            if tombstone:
+                continue
+
+        add_record(key)
+        add_record(value)
+
+        if len(buffer) >= SNAPSHOT_CHUNK:
+            fileobj.write(buffer)
+            buffer.clear()
+
+    fileobj.write(buffer)
+
+
+def load_snapshot(fileobj, function=None) -> tuple:
+    """
+    Read a snapshot written by dump_snapshot from a binary file object.
+    Returns (function, flags, capacity, size, max_probe, slots), where slots yields the
+    (index, hash, key, value, tombstone) tuples; index and hash are None without SNAPSHOT_LAYOUT.
+    function defaults to the registered hash function named in the snapshot.
+    """
+    view = memoryview(fileobj.read())
+    magic, version, flags, capacity, size, max_probe, count = SNAPSHOT_HEADER.unpack_from(view, 0)
+
+    if magic != SNAPSHOT_MAGIC or version != SNAPSHOT_VERSION:
+        raise ValueError('not a hash map snapshot')
+
+    offset = SNAPSHOT_HEADER.size
+
+    def read_record() -> object:
+        nonlocal offset
+        length = _U32.unpack_from(view, offset)[0]
+        offset += _U32.size + length
+        return decode_value(view[offset - length:offset])
+
+    name, seed = read_record(), read_record()
+
+    if function is None:
+        if name is None:
+            raise ValueError('snapshot hash function is not registered, so function must be given')
+        function = get_hash_function(name, seed)
+
+    def read_slots():
+        nonlocal offset
+        layout = flags & SNAPSHOT_LAYOUT
+        index = hash = None
+        tombstone = False
+
+        for _ in range(count):
+            if layout:
+                index, hash, tombstone = SNAPSHOT_SLOT.unpack_from(view, offset)
+                offset += SNAPSHOT_SLOT.size
+                if tombstone:
+                    yield index, hash, None, None, True
+                    continue
+
+            key = read_record()
+            yield index, hash, key, read_record(), False
+
+    return function, flags, capacity, size, max_probe, read_slots()
+
+
+# ---------- Views shared by the HashMap classes ---------- #
+
+# What a map iterator returns for each pair.
+ITER_KEYS, ITER_VALUES, ITER_ITEMS = 0, 1, 2
+
+
+class HashMapKeysView(KeysView):
+    """Live view of a map's keys. Iterates the map's table directly instead of copying it."""
+
+    __slots__ = ()
+
+    def __iter__(self):
+        """Return a new iterator over the keys."""
+        return self._mapping._iterator(ITER_KEYS)
+
+
+class HashMapValuesView(ValuesView):
+    """Live view of a map's values. Iterates the map's table directly instead of copying it."""
+
+    __slots__ = ()
+
+    def __iter__(self):
+        """Return a new iterator over the values."""
+        return self._mapping._iterator(ITER_VALUES)
+
+    def __contains__(self, value: object) -> bool:
+        """Return True if any value is or equals value, without a lookup per key."""
+        for item in self:
+            if item is value or item == value:
+                return True
+        return False
+
+
+class HashMapItemsView(ItemsView):
+    """Live view of a map's (key, value) pairs. Iterates the map's table directly instead of copying it."""
+
+    __slots__ = ()
+
+    def __iter__(self):
+        """Return a new iterator over the (key, value) pairs."""
+        return self._mapping._iterator(ITER_ITEMS)
@@ -0,0 +1,541 @@
+# Description: Bounded cache built on the HashMap engines. CacheMap stores its entries in a separate chaining or
+#              open addressing HashMap and threads a least recently used list through the map's own SLNode or
+#              HashEntry records (their prev and next links), so there is no second dictionary and a hit costs
+#              one probe. Entries are evicted from the cold end once a max_entries or max_bytes budget is
+#              reached. An optional TinyLFU admission filter keeps a small frequency sketch and only lets a new
+#              key in if it has been asked for more often than the entry it would evict.
+
+
+import sys
+from collections.abc import MutableMapping
+
+from base_include import (SLNode, mix_hash, MASK_64, HashMapKeysView, HashMapValuesView, HashMapItemsView,
+                        ITER_KEYS, ITER_VALUES, hash_function_1, hash_function_2)
+import hash_map_oa
+import hash_map_sc
+
+# Halves every counter of a frequency sketch in one bytearray.translate call.
+_HALVE = bytes(count >> 1 for count in range(256))
+
+
+def default_sizeof(key: object, value: object) -> int:
+    """
+    :return: Byte cost of a key-value pair, the shallow sys.getsizeof of the key plus that of the value.
+    """
+
+    return sys.getsizeof(key) + sys.getsizeof(value)
+
+
+class FrequencySketch:
+    """
+    Count-min sketch of how often each key hash was seen, for TinyLFU admission.
+    Counters are bytes capped at 15 in ROWS rows of a power-of-two width. After 10 * width increments
+    every counter is halved, so old popularity fades.
+    Supported methods are: increment, frequency, admit
+    """
+
+    ROWS = 4
+    MAX_COUNT = 15
+
+    def __init__(self, width: int) -> None:
+        """
+        Initialize a sketch with at least width counters per row.
+        """
+        self._width = 1 << max(width - 1, 15).bit_length()
+        self._mask = self._width - 1
+        self._table = bytearray(self.ROWS * self._width)
+        self._additions = 0
+        self._sample_size = 10 * self._width
+
+    def _indexes(self, hash_value: int) -> list:
+        """
+        :param hash_value: Full hash of a key.
+        :return: Counter index in each row.
+        """
+
+        hash_value &= MASK_64
+        width, mask = self._width, self._mask
+        return [row * width + (mix_hash(hash_value + row) & mask) for row in range(self.ROWS)]
+
+    def increment(self, hash_value: int) -> None:
+        """
+        :param hash_value: Full hash of a key.
+
+        Counts one more sighting of the key.
+        """
+
+        table = self._table
+        for index in self._indexes(hash_value):
+            if table[index] < self.MAX_COUNT:
+                table[index] += 1
+
+        self._additions += 1
+        if self._additions >= self._sample_size:
+            self._table = bytearray(table.translate(_HALVE))
+            self._additions //= 2
+
+    def frequency(self, hash_value: int) -> int:
+        """
+        :param hash_value: Full hash of a key.
+        :return: Estimated number of sightings of the key, never an undercount before aging.
+        """
+
+        table = self._table
+        return min(table[index] for index in self._indexes(hash_value))
+
+    def admit(self, candidate: int, victim: int) -> bool:
+        """
+        :param candidate: Full hash of a key waiting to enter the cache.
+        :param victim: Full hash of the key it would evict.
+        :return: True if the candidate has been seen more often than the victim.
+        """
+
+        return self.frequency(candidate) > self.frequency(victim)
+
+
+class CacheMap(MutableMapping):
+    """
+    Bounded least recently used cache on top of hash_map_sc.HashMap or hash_map_oa.HashMap.
+    get and [] count a hit or a miss and mark the key as most recently used; contains_key and in do not.
+    put evicts the least recently used entries once the max_entries or max_bytes budget would be
+    exceeded. With tinylfu, a new key only enters a full cache if the frequency sketch has seen it more
+    often than the entry it would evict; otherwise it is rejected and the cache is unchanged.
+    Iteration runs from the most to the least recently used key. Not thread-safe.
+    """
+
+    def __init__(self,
+                 max_entries: int = None,
+                 max_bytes: int = None,
+                 hash_map=None,
+                 tinylfu: bool = False,
+                 sizeof: callable = default_sizeof) -> None:
+        """
+        Initialize a new empty cache holding at most max_entries pairs and/or pairs whose sizeof costs
+        add up to at most max_bytes. hash_map is the empty hash_map_sc.HashMap or hash_map_oa.HashMap
+        that stores the entries; a separate chaining HashMap with hash_function_1 is used by default.
+        """
+        if max_entries is None and max_bytes is None:
+            raise ValueError('CacheMap needs max_entries or max_bytes')
+        if (max_entries is not None and max_entries < 1) or (max_bytes is not None and max_bytes < 1):
+            raise ValueError('cache budgets must be positive')
+
+        if hash_map is None:
+            hash_map = hash_map_sc.HashMap(11, hash_function_1)
+
+        if isinstance(hash_map, hash_map_sc.HashMap):
+            self._find = hash_map._get_node_from_key
+        elif isinstance(hash_map, hash_map_oa.HashMap):
+            self._find = hash_map._get_entry_from_key
+        else:
+            raise TypeError('CacheMap stores entries in hash_map_sc.HashMap or hash_map_oa.HashMap')
+
+        if hash_map.get_size():
+            raise ValueError('CacheMap needs an empty hash map')
+
+        self._map = hash_map
+        self._hash_key = hash_map._hash_key
+        self._put_record = hash_map._put_record
+        self._max_entries = max_entries
+        self._max_bytes = max_bytes
+        self._sizeof = sizeof
+        self._bytes = 0
+        self._sketch = FrequencySketch(max_entries or 1024) if tinylfu else None
+
+        # Sentinel of the circular recency list: _head.next is the most recently used record.
+        self._head = SLNode(None, None)
+        self._head.prev = self._head.next = self._head
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.rejections = 0
+
+    def __str__(self) -> str:
+        """
+        Override string method to provide more readable output
+        """
+        out = ''
+        for key, value in self.items():
+            out += str(key) + ': ' + str(value) + '\n'
+        return out
+
+    def get_size(self) -> int:
+        """
+        Return size of cache
+        """
+        return self._map.get_size()
+
+    def get_bytes(self) -> int:
+        """
+        Return the summed sizeof cost of the cached pairs (0 unless max_bytes is set)
+        """
+        return self._bytes
+
+    # ------------------------------------------------------------------ #
+
+
+    def put(self, key: str, value: object) -> None:
+        """
+        :param key: String that maps to an integer index of the HashMap.
+        :param value: Object to be cached.
+
+        Updates or adds the key-value pair and marks it as most recently used, evicting least recently
+        used entries to stay within budget. A pair that alone exceeds max_bytes is not cached, and with
+        tinylfu a new key may be rejected instead of evicting a more popular one.
+        """
+
+        hash_value = self._hash_key(key)
+        if self._sketch is not None:
+            self._sketch.increment(hash_value)
+
+        cost = self._sizeof(key, value) if self._max_bytes is not None else 0
+        record = self._find(key, hash_value)
+
+        if record is not None:
+            # Replace existing value.
+            record.value = value
+            self._bytes += cost - record.cost
+            record.cost = cost
+            self._move_to_front(record)
+            self._trim()
+            return
+
+        if self._max_bytes is not None and cost > self._max_bytes:
+            self.rejections += 1
+            return
+
+        if self._sketch is not None and self._over_budget(cost):
+            if not self._sketch.admit(hash_value, self._head.prev.hash):
+                self.rejections += 1
+                return
+
+        while self._head.prev is not self._head and self._over_budget(cost):
+            self._evict(self._head.prev)
+
+        record = self._put_record(key, value, hash_value)
+        record.cost = cost
+        self._bytes += cost
+        self._link_front(record)
+
+
+    def get(self, key: str, default: object = None) -> object:
+        """
+        :param key: String that maps to an integer index of the HashMap.
+        :param default: Object returned when key is not cached.
+        :return: Object paired to key.
+
+        Returns the cached value and marks it as most recently used, counting a hit. If the key is not
+        cached, counts a miss and returns default (None unless given).
+        """
+
+        record = self._lookup(key)
+
+        if record is None:
+            return default
+
+        return record.value
+
+
+    def contains_key(self, key: str) -> bool:
+        """
+        :param key: String that maps to an integer index of the HashMap.
+        :return: True if key is cached. False otherwise.
+
+        Checks for the key without counting a hit or miss or changing its recency.
+        """
+
+        return self._find(key, self._hash_key(key)) is not None
+
+
+    def remove(self, key: str) -> None:
+        """
+        :param key: String that maps to an integer index of the HashMap.
+
+        Removes given key and its associated value from the cache.
+        If the key is not cached, the method does nothing.
+        """
+
+        record = self._find(key, self._hash_key(key))
+
+        if record is not None:
+            self._discard(record)
+
+
+    def clear(self) -> None:
+        """
+        Clears the cache. The counters and frequency sketch are kept.
+        """
+
+        self._map.clear()
+        self._head.prev = self._head.next = self._head
+        self._bytes = 0
+
+
+    def reset_stats(self) -> None:
+        """
+        Sets the hit, miss, eviction and rejection counters back to 0.
+        """
+
+        self.hits = self.misses = self.evictions = self.rejections = 0
+
+
+    def hit_rate(self) -> float:
+        """
+        Returns hits / (hits + misses), or 0.0 before any lookup.
+        """
+
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+    # ---------------------- Mapping protocol ---------------------- #
+
+    def __getitem__(self, key: str) -> object:
+        """
+        Returns the cached value using [] syntax, counting a hit or miss like get.
+        Raises KeyError if key is not cached.
+        """
+
+        record = self._lookup(key)
+
+        if record is None:
+            raise KeyError(key)
+
+        return record.value
+
+
+    def __setitem__(self, key: str, value: object) -> None:
+        """
+        Adds or updates key-value pair using [] syntax.
+        """
+
+        self.put(key, value)
+
+
+    def __delitem__(self, key: str) -> None:
+        """
+        Removes key using del syntax. Raises KeyError if key is not cached.
+        """
+
+        record = self._find(key, self._hash_key(key))
+
+        if record is None:
+            raise KeyError(key)
+
+        self._discard(record)
+
+
+    def __contains__(self, key: str) -> bool:
+        """
+        Returns True if key is cached, for use with the in operator.
+        """
+
+        return self.contains_key(key)
+
+
+    def __len__(self) -> int:
+        """
+        Returns the number of cached key-value pairs.
+        """
+
+        return self._map.get_size()
+
+
+    def __iter__(self):
+        """
+        Returns an iterator over the keys from most to least recently used.
+        """
+
+        return self._iterator(ITER_KEYS)
+
+
+    def keys(self) -> HashMapKeysView:
+        """
+        Returns a live view of the keys, most recently used first.
+        """
+
+        return HashMapKeysView(self)
+
+
+    def values(self) -> HashMapValuesView:
+        """
+        Returns a live view of the values, most recently used first.
+        """
+
+        return HashMapValuesView(self)
+
+
+    def items(self) -> HashMapItemsView:
+        """
+        Returns a live view of the (key, value) pairs, most recently used first. Walking it counts no hits.
+        """
+
+        return HashMapItemsView(self)
+
+
+    def _iterator(self, kind: int):
+        """
+        :param kind: ITER_KEYS, ITER_VALUES or ITER_ITEMS.
+        :return: New iterator over the recency list.
+        """
+
+        head = self._head
+        record = head.next
+
+        while record is not head:
+            # Read the link first, so moving or evicting this record does not derail the walk.
+            following = record.next
+
+            if kind == ITER_KEYS:
+                yield record.key
+            elif kind == ITER_VALUES:
+                yield record.value
+            else:
+                yield record.key, record.value
+
+            record = following
+
+
+    def _lookup(self, key: str) -> object:
+        """
+        :param key: String that maps to an integer index of the HashMap.
+        :return: Record of key, or None.
+
+        Finds the record for get and [], updating the counters, the sketch and the recency list.
+        """
+
+        hash_value = self._hash_key(key)
+        if self._sketch is not None:
+            self._sketch.increment(hash_value)
+
+        record = self._find(key, hash_value)
+
+        if record is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        self._move_to_front(record)
+        return record
+
+
+    def _over_budget(self, cost: int) -> bool:
+        """
+        :param cost: Byte cost of a pair about to be added.
+        :return: True if adding one more pair of that cost would exceed a budget.
+        """
+
+        if self._max_entries is not None and self._map.get_size() >= self._max_entries:
+            return True
+
+        return self._max_bytes is not None and self._bytes + cost > self._max_bytes
+
+
+    def _trim(self) -> None:
+        """
+        Evicts least recently used entries until the byte budget holds again after an update. If the
+        updated pair alone exceeds it, the pair is evicted too.
+        """
+
+        if self._max_bytes is None:
+            return
+
+        while self._bytes > self._max_bytes:
+            self._evict(self._head.prev)
+
+
+    def _evict(self, record: object) -> None:
+        """
+        :param record: Least recently used record.
+
+        Removes the record from the cache and counts an eviction.
+        """
+
+        self._discard(record)
+        self.evictions += 1
+
+
+    def _discard(self, record: object) -> None:
+        """
+        :param record: Cached SLNode or HashEntry.
+
+        Unlinks the record from the recency list, then removes its key from the hash map. Unlinking comes
+        first because the open addressing map turns the entry into a tombstone that a later put may reuse.
+        """
+
+        self._unlink(record)
+        self._bytes -= record.cost
+        self._map._remove(record.key, record.hash)
+
+
+    def _link_front(self, record: object) -> None:
+        """
+        Links a record in as the most recently used.
+        """
+
+        head = self._head
+        record.prev, record.next = head, head.next
+        head.next.prev = record
+        head.next = record
+
+
+    def _unlink(self, record: object) -> None:
+        """
+        Takes a record out of the recency list.
+        """
+
+        record.prev.next = record.next
+        record.next.prev = record.prev
+        record.prev = record.next = None
+
+
+    def _move_to_front(self, record: object) -> None:
+        """
+        Marks a record as the most recently used.
+        """
+
+        if self._head.next is not record:
+            self._unlink(record)
+            self._link_front(record)
+
+
+# ------------------- BASIC TESTING ---------------------------------------- #
+
+
+if __name__ == "__main__":
+
+    print("\nCacheMap - LRU example 1")
+    print("------------------------")
+    cache = CacheMap(3)
+    for key in ('a', 'b', 'c'):
+        cache.put(key, key.upper())
+    print(cache.get('a'), cache.get('z'))
+    cache.put('d', 'D')
+    print(list(cache), cache.contains_key('b'))
+    print(cache.hits, cache.misses, cache.evictions)
+
+    print("\nCacheMap - open addressing example 1")
+    print("------------------------------------")
+    cache = CacheMap(100, hash_map=hash_map_oa.HashMap(11, hash_function_2))
+    for i in range(1000):
+        cache.put('str' + str(i), i)
+        cache.get('str' + str(i // 2))
+    print(cache.get_size(), cache.evictions, round(cache.hit_rate(), 2), 'str999' in cache, 'str0' in cache)
+
+    print("\nCacheMap - max_bytes example 1")
+    print("------------------------------")
+    cache = CacheMap(max_bytes=2000)
+    for i in range(100):
+        cache.put(str(i), 'x' * i)
+    print(cache.get_size(), cache.get_bytes() <= 2000, cache.evictions, cache.rejections)
+
+    print("\nCacheMap - TinyLFU example 1")
+    print("----------------------------")
+    plain, filtered = CacheMap(50), CacheMap(50, tinylfu=True)
+    for cache in (plain, filtered):
+        for i in range(5000):
+            # 40 hot keys take turns; every other request is for a key that is never asked for again.
+            key = 'hot' + str(i // 2 % 40) if i % 2 else 'scan' + str(i)
+            if cache.get(key) is None:
+                cache.put(key, i)
+        print(round(cache.hit_rate(), 2), cache.evictions, cache.rejections)
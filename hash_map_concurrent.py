@@ -0,0 +1,360 @@
+# Description: Thread-safe separate chaining HashMap. Writers lock one stripe of buckets instead of the whole map,
+#              so puts and removes on different stripes run at the same time. Reads take no lock: the table is
+#              published as one (buckets, capacity, mask) tuple, writers replace a bucket instead of changing
+#              an overflow array in place, and a resize builds a complete new table before publishing it, so a
+#              reader always probes a whole bucket of either the old table or the new one.
+
+
+import threading
+
+from base_include import (DynamicArray, SLNode, bucket_find, bucket_add, bucket_discard, bucket_nodes,
+                        bucket_copy, ITER_KEYS, ITER_VALUES, hash_function_1, hash_function_2)
+import hash_map_sc
+
+
+class ConcurrentHashMap(hash_map_sc.HashMap):
+    """
+    Separate chaining HashMap that can be shared between threads.
+    Bucket index % stripes picks the lock that guards a bucket. A resize or clear holds every stripe lock.
+    Iteration is weakly consistent: it walks the table that was current when it started, never raises
+    RuntimeError, and may or may not see changes made while it runs.
+    Incremental resizing is not supported.
+    """
+
+    # Default number of stripe locks.
+    STRIPES = 16
+
+    def __init__(self,
+                 capacity: int = 11,
+                 function: callable = hash_function_1,
+                 incremental: bool = False,
+                 seed: int = None,
+                 power_of_two: bool = False,
+                 stripes: int = None) -> None:
+        """
+        Initialize new ConcurrentHashMap that uses
+        separate chaining for collision resolution and stripes locks (STRIPES by default) for writers.
+        The other arguments are the same as for hash_map_sc.HashMap.
+        """
+        if incremental:
+            raise ValueError('ConcurrentHashMap does not support incremental resizing')
+
+        self._stripes = stripes or self.STRIPES
+        self._locks = [threading.Lock() for _ in range(self._stripes)]
+
+        # Size is kept per stripe, so writers only update the count guarded by their own lock.
+        self._counts = [0] * self._stripes
+
+        super().__init__(capacity, function, False, seed, power_of_two)
+        self._table = (self._buckets, self._capacity, self._mask)
+
+    @property
+    def _size(self) -> int:
+        """
+        Number of key-value pairs, summed over the stripes.
+        """
+        return sum(self._counts)
+
+    @_size.setter
+    def _size(self, size: int) -> None:
+        """
+        Sets the number of key-value pairs. Only used while no other thread can write.
+        """
+        self._counts = [size] + [0] * (self._stripes - 1)
+
+    # ------------------------------------------------------------------ #
+
+
+    def _put(self, key: str, value: object, hash_value: int) -> SLNode:
+        """
+        :param key: String that maps to an integer index of the HashMap.
+        :param value: Object to be added to the mapped location.
+        :param hash_value: Full hash of key, computed once by the caller.
+        :return: SLNode holding key.
+
+        Performs put under the lock of the key's stripe. Doubles the table capacity once the load factor
+        reaches 1.
+        """
+
+        while True:
+            table = buckets, capacity, mask = self._table
+            index = hash_value & mask if mask is not None else hash_value % capacity
+            stripe = index % self._stripes
+
+            with self._locks[stripe]:
+
+                # A resize published a new table before the lock was taken; try again on it.
+                if self._table is not table:
+                    continue
+
+                bucket = buckets[index]
+                node = bucket_find(bucket, key, hash_value)
+
+                if node is not None:
+                    # Replace existing value.
+                    node.value = value
+                    return node
+
+                # Store a changed copy of the bucket rather than changing the one readers may be walking.
+                node = SLNode(key, value, None, hash_value)
+                buckets[index] = bucket_add(bucket_copy(bucket), node)
+                self._counts[stripe] += 1
+                break
+
+        # Check if resize is needed.
+        if self._size >= capacity:
+            self._rebuild(table, capacity * 2)
+
+        return node
+
+
+    def resize_table(self, new_capacity: int) -> None:
+        """
+        :param new_capacity: Integer value of the HashMap table's new capacity.
+
+        Changes the underlying table's capacity while holding every stripe lock. Rounding and
+        pre-sizing are the same as for hash_map_sc.HashMap.
+        """
+
+        # If new_capacity is less than one, method does nothing.
+        if new_capacity < 1:
+            return
+
+        self._rebuild(None, new_capacity)
+
+
+    def empty_buckets(self) -> int:
+        """
+        :return: Integer of empty buckets.
+
+        Returns the number of empty buckets in the current table.
+        """
+
+        buckets, capacity, mask = self._table
+        empty_buckets = 0
+
+        for index in range(capacity):
+            if buckets[index] is None:
+                empty_buckets += 1
+
+        return empty_buckets
+
+
+    def get_keys_and_values(self) -> DynamicArray:
+        """
+        :return: Dynamic array of key-value pairs.
+
+        Returns a dynamic array where each index contains a tuple of a key-value pair from the hash map.
+        """
+
+        contents_da = DynamicArray()
+
+        for pair in self.items():
+            contents_da.append(pair)
+
+        return contents_da
+
+
+    def clear(self) -> None:
+        """
+        Clears the contents of the hash map without changing the underlying table capacity.
+        """
+
+        self._lock_all()
+        try:
+            buckets = DynamicArray([None] * self._capacity)
+
+            self._counts = [0] * self._stripes
+            self._publish(buckets, self._capacity, self._mask)
+        finally:
+            self._unlock_all()
+
+
+    def dump(self, fileobj, layout: bool = False) -> None:
+        """
+        :param fileobj: Binary file object opened for writing.
+        :param layout: If True, also save each node's bucket index and cached hash.
+
+        Writes a binary snapshot while holding every stripe lock, so the size in the header matches
+        the records.
+        """
+
+        self._lock_all()
+        try:
+            super().dump(fileobj, layout)
+        finally:
+            self._unlock_all()
+
+
+    def _remove(self, key: str, hash_value: int) -> bool:
+        """
+        :param key: String that maps to an integer index of the HashMap.
+        :param hash_value: Full hash of key, computed once by the caller.
+        :return: True if key was removed. False if key was not in the hash map.
+
+        Performs remove under the lock of the key's stripe. The bucket is replaced by one without the
+        node, so readers walking the old bucket still see all of it.
+        """
+
+        while True:
+            table = buckets, capacity, mask = self._table
+            index = hash_value & mask if mask is not None else hash_value % capacity
+            stripe = index % self._stripes
+
+            with self._locks[stripe]:
+                if self._table is not table:
+                    continue
+
+                bucket = buckets[index]
+                if bucket_find(bucket, key, hash_value) is None:
+                    return False
+
+                buckets[index] = bucket_discard(bucket_copy(bucket), key, hash_value)[0]
+                self._counts[stripe] -= 1
+                return True
+
+
+    def _get_node_from_key(self, key: str, hash_value: int = None) -> object:
+        """
+        :param key: String that maps to an integer index of the HashMap.
+        :param hash_value: Full hash of key. Computed from key if not given.
+        :return: SLNode associated with key.
+
+        Returns the node that matches the key without taking a lock. If key is not found, returns None.
+        """
+
+        if hash_value is None:
+            hash_value = self._hash_key(key)
+
+        buckets, capacity, mask = self._table
+        index = hash_value & mask if mask is not None else hash_value % capacity
+
+        return bucket_find(buckets[index], key, hash_value)
+
+
+    def _iterator(self, kind: int):
+        """
+        :param kind: ITER_KEYS, ITER_VALUES or ITER_ITEMS.
+        :return: New iterator over the hash map.
+
+        Returns a weakly consistent iterator over the table that is current when it is called.
+        """
+
+        buckets, capacity, mask = self._table
+
+        for index in range(capacity):
+            for node in bucket_nodes(buckets[index]):
+                if kind == ITER_KEYS:
+                    yield node.key
+                elif kind == ITER_VALUES:
+                    yield node.value
+                else:
+                    yield node.key, node.value
+
+
+    def __iter__(self):
+        """
+        Returns a new weakly consistent iterator over the keys in the hash map.
+        """
+
+        return self._iterator(ITER_KEYS)
+
+
+    def _rebuild(self, table: tuple, new_capacity: int) -> None:
+        """
+        :param table: Table that must still be current for the rebuild to go ahead, or None to always rebuild.
+        :param new_capacity: Requested capacity of the new table.
+
+        Moves every node into a new table of at least new_capacity buckets while holding every stripe
+        lock, then publishes it. Only the new table's buckets are built, so readers still walking the old
+        table see every bucket intact.
+        """
+
+        self._lock_all()
+        try:
+            # Another thread already grew the table.
+            if table is not None and self._table is not table:
+                return
+
+            old_buckets, old_capacity, mask = self._table
+
+            new_capacity = self._next_capacity(new_capacity)
+            while new_capacity < self._size:
+                new_capacity = self._next_capacity(new_capacity * 2)
+
+            if mask is not None:
+                mask = new_capacity - 1
+
+            buckets = DynamicArray([None] * new_capacity)
+
+            for old_index in range(old_capacity):
+                for node in bucket_nodes(old_buckets[old_index]):
+                    index = node.hash & mask if mask is not None else node.hash % new_capacity
+                    buckets[index] = bucket_add(buckets[index], node)
+
+            self._publish(buckets, new_capacity, mask)
+        finally:
+            self._unlock_all()
+
+
+    def _publish(self, buckets: DynamicArray, capacity: int, mask: int) -> None:
+        """
+        Makes a table current. Readers pick up the single _table tuple, so they never pair the buckets of
+        one table with the capacity of another.
+        """
+
+        self._buckets, self._capacity, self._mask = buckets, capacity, mask
+        self._table = (buckets, capacity, mask)
+        self._modcount += 1
+
+
+    def _lock_all(self) -> None:
+        """
+        Acquires every stripe lock, always in stripe order so two threads cannot deadlock.
+        """
+
+        for lock in self._locks:
+            lock.acquire()
+
+
+    def _unlock_all(self) -> None:
+        """
+        Releases every stripe lock.
+        """
+
+        for lock in reversed(self._locks):
+            lock.release()
+
+
+# ------------------- BASIC TESTING ---------------------------------------- #
+
+
+if __name__ == "__main__":
+
+    from concurrent.futures import ThreadPoolExecutor
+
+    print("\nConcurrentHashMap - put example 1")
+    print("---------------------------------")
+    m = ConcurrentHashMap(53, hash_function_1)
+    for i in range(150):
+        m.put('str' + str(i), i * 100)
+        if i % 25 == 24:
+            print(m.empty_buckets(), round(m.table_load(), 2), m.get_size(), m.get_capacity())
+
+    print("\nConcurrentHashMap - threads example 1")
+    print("-------------------------------------")
+    m = ConcurrentHashMap(11, hash_function_2)
+
+    def worker(start: int) -> None:
+        for i in range(start, start + 1000):
+            m.put(str(i), i)
+            if i % 3 == 0:
+                m.remove(str(i))
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(worker, range(0, 8000, 1000)))
+
+    result = True
+    for i in range(8000):
+        result &= m.get(str(i)) == (None if i % 3 == 0 else i)
+    print(m.get_size(), m.get_capacity(), result)
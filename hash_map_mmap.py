@@ -0,0 +1,385 @@
+# Description: Memory-mapped, read-only open addressing table. write_table saves the slot layout of an open
+#              addressing HashMap (state bytes, cached hashes, key offsets and value offsets) followed by a heap
+#              of encoded keys and values. MappedHashMap opens the file with mmap and answers get and
+#              contains_key straight from the mapped pages, so startup does no rehashing or deserialization and
+#              every process that opens the same file shares one copy of it in the page cache.
+#
+#              File layout (little-endian):
+#                  header        HEADER
+#                  states        capacity bytes, EMPTY / LIVE / TOMBSTONE, padded to a multiple of 8
+#                  hashes        capacity unsigned 64-bit cached hashes
+#                  key offsets   capacity unsigned 64-bit heap offsets
+#                  value offsets capacity unsigned 64-bit heap offsets
+#                  heap          records of a 32-bit length and an encode_value payload
+
+
+import mmap
+import struct
+import sys
+from array import array
+from collections.abc import Mapping
+
+from base_include import (encode_value, decode_value, get_hash_function, hash_function_id,
+                        mixed_hash_function)
+import hash_map_oa
+from hash_map_oa import EMPTY, LIVE, TOMBSTONE
+
+MAGIC = b'HMOA'
+VERSION = 1
+
+# Header flag set when the table was built in power-of-two mode.
+FLAG_POWER_OF_TWO = 1
+
+# magic, version, flags, capacity, size, max probe, heap offsets of the hash function name and seed
+HEADER = struct.Struct('<4sHHQQQQQ')
+
+_U32 = struct.Struct('<I')
+_U64 = struct.Struct('<Q')
+
+
+def table_offsets(capacity: int) -> tuple:
+    """
+    :param capacity: Number of slots in the table.
+    :return: Tuple of file offsets of the states, hashes, key offsets, value offsets and heap.
+    """
+
+    states = HEADER.size
+    hashes = states + (capacity + 7) // 8 * 8
+    keys = hashes + 8 * capacity
+    values = keys + 8 * capacity
+    return states, hashes, keys, values, values + 8 * capacity
+
+
+def _slots(hash_map) -> tuple:
+    """
+    :param hash_map: hash_map_oa.HashMap or hash_map_oa.ArrayHashMap.
+    :return: Tuple of a state bytearray, a list of hashes, a list of keys and a list of values.
+
+    Returns the map's slot arrays as they are laid out, tombstones included.
+    """
+
+    if isinstance(hash_map, hash_map_oa.ArrayHashMap):
+        return hash_map._states, hash_map._hashes, hash_map._keys, hash_map._values
+
+    # The saved table has to be the only table.
+    hash_map._finish_migration()
+
+    capacity = hash_map.get_capacity()
+    states, hashes, keys, values = bytearray(capacity), [0] * capacity, [None] * capacity, [None] * capacity
+
+    for index in range(capacity):
+        hash_entry = hash_map._buckets[index]
+
+        if hash_entry is not None:
+            states[index] = TOMBSTONE if hash_entry.is_tombstone else LIVE
+            hashes[index] = hash_entry.hash
+            keys[index], values[index] = hash_entry.key, hash_entry.value
+
+    return states, hashes, keys, values
+
+
+def write_table(hash_map, path: str) -> None:
+    """
+    :param hash_map: hash_map_oa.HashMap or hash_map_oa.ArrayHashMap built with a registered hash function.
+    :param path: File to create or overwrite.
+
+    Saves the map's slot layout and a heap of its keys and values to path. Slots keep their positions,
+    so MappedHashMap probes the file exactly as the map probes its table.
+    Raises ValueError if the hash function is not registered or a cached hash does not fit in 64 bits.
+    """
+
+    name, seed = hash_function_id(hash_map._hash_function)
+    power_of_two = getattr(hash_map, '_mask', None) is not None
+    states, hashes, keys, values = _slots(hash_map)
+
+    capacity = hash_map.get_capacity()
+    states_offset, hashes_offset, keys_offset, values_offset, heap_offset = table_offsets(capacity)
+
+    try:
+        hash_array = array('Q', hashes)
+    except OverflowError:
+        raise ValueError('cached hashes must fit in 64 bits') from None
+
+    key_offsets, value_offsets = array('Q', bytes(8 * capacity)), array('Q', bytes(8 * capacity))
+
+    with open(path, 'wb') as file:
+
+        # Slot arrays are written once the heap has placed every record.
+        file.seek(heap_offset)
+        position = 0
+
+        def write_record(value) -> int:
+            nonlocal position
+            data = encode_value(value)
+            file.write(_U32.pack(len(data)))
+            file.write(data)
+            offset, position = position, position + _U32.size + len(data)
+            return offset
+
+        name_offset, seed_offset = write_record(name), write_record(seed)
+
+        for index in range(capacity):
+            if states[index] == LIVE:
+                key_offsets[index] = write_record(keys[index])
+                value_offsets[index] = write_record(values[index])
+
+        if sys.byteorder == 'big':
+            hash_array.byteswap()
+            key_offsets.byteswap()
+            value_offsets.byteswap()
+
+        file.seek(0)
+        file.write(HEADER.pack(MAGIC, VERSION, FLAG_POWER_OF_TWO if power_of_two else 0, capacity,
+                               hash_map.get_size(), hash_map._max_probe, name_offset, seed_offset))
+        file.write(bytes(states))
+        file.write(bytes(hashes_offset - states_offset - capacity))
+        file.write(hash_array.tobytes())
+        file.write(key_offsets.tobytes())
+        file.write(value_offsets.tobytes())
+
+
+class MappedHashMap(Mapping):
+    """
+    Read-only open addressing HashMap backed by a file from write_table.
+    Lookups read slots straight from the memory-mapped file; only the key being compared and the value
+    being returned are decoded. Supports get, contains_key, get_size, get_capacity and the read-only
+    mapping protocol.
+    """
+
+    def __init__(self, path: str) -> None:
+        """
+        Open the table saved at path. The hash function is rebuilt from the registry name and seed
+        stored in the file.
+        """
+        with open(path, 'rb') as file:
+            self._mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, flags, capacity, size, max_probe, name_offset, seed_offset = \
+            HEADER.unpack_from(self._mmap, 0)
+
+        if magic != MAGIC or version != VERSION:
+            self._mmap.close()
+            raise ValueError('not a mapped hash table file: ' + repr(path))
+
+        self._capacity = capacity
+        self._size = size
+        self._max_probe = max_probe
+        self._mask = capacity - 1 if flags & FLAG_POWER_OF_TWO else None
+        (self._states, self._hashes, self._keys,
+         self._values, self._heap) = table_offsets(capacity)
+
+        self._hash_function = get_hash_function(self._read_record(name_offset),
+                                                self._read_record(seed_offset))
+        if self._mask is not None:
+            self._hash_key = mixed_hash_function(self._hash_function)
+        else:
+            self._hash_key = self._hash_function
+
+    def __str__(self) -> str:
+        """
+        Override string method to provide more readable output
+        """
+        out = ''
+        for index in range(self._capacity):
+            out += str(index) + ': '
+            state = self._mmap[self._states + index]
+            if state == LIVE:
+                out += 'K: ' + str(self._read_slot(self._keys, index)) + \
+                       ' V: ' + str(self._read_slot(self._values, index))
+            else:
+                out += 'None' if state == EMPTY else 'TS'
+            out += '\n'
+        return out
+
+    def get_size(self) -> int:
+        """
+        Return size of map
+        """
+        return self._size
+
+    def get_capacity(self) -> int:
+        """
+        Return capacity of map
+        """
+        return self._capacity
+
+    # ------------------------------------------------------------------ #
+
+
+    def get(self, key: str, default: object = None) -> object:
+        """
+        :param key: String that maps to an integer index of the HashMap.
+        :param default: Object returned when key is not in the hash map.
+        :return: Object paired to key.
+
+        Returns the value associated with the given key.
+        If the key is not in the hash map, the method returns default (None unless given).
+        """
+
+        index = self._get_index_from_key(key)
+
+        if index is not None:
+            return self._read_slot(self._values, index)
+
+        return default
+
+
+    def contains_key(self, key: str) -> bool:
+        """
+        :param key: String that maps to an integer index of the HashMap.
+        :return: True if key is in HashMap. False otherwise.
+
+        Returns True if the given key is in the hash map, otherwise it returns False.
+        """
+
+        return self._get_index_from_key(key) is not None
+
+
+    def close(self) -> None:
+        """
+        Unmaps the file. The map cannot be used afterwards.
+        """
+
+        self._mmap.close()
+
+
+    def __enter__(self) -> "MappedHashMap":
+        """
+        Returns the map for use in a with statement.
+        """
+
+        return self
+
+
+    def __exit__(self, *exc_info) -> None:
+        """
+        Unmaps the file at the end of a with statement.
+        """
+
+        self.close()
+
+
+    # ---------------------- Mapping protocol ---------------------- #
+
+    def __getitem__(self, key: str) -> object:
+        """
+        Returns the value paired to key using [] syntax. Raises KeyError if key is not in the hash map.
+        """
+
+        index = self._get_index_from_key(key)
+
+        if index is None:
+            raise KeyError(key)
+
+        return self._read_slot(self._values, index)
+
+
+    def __contains__(self, key: str) -> bool:
+        """
+        Returns True if key is in the hash map, for use with the in operator.
+        """
+
+        return self._get_index_from_key(key) is not None
+
+
+    def __len__(self) -> int:
+        """
+        Returns the number of key-value pairs in the hash map.
+        """
+
+        return self._size
+
+
+    def __iter__(self):
+        """
+        Returns an iterator over the keys in the hash map.
+        """
+
+        states = self._states
+
+        for index in range(self._capacity):
+            if self._mmap[states + index] == LIVE:
+                yield self._read_slot(self._keys, index)
+
+
+    def _read_record(self, offset: int) -> object:
+        """
+        :param offset: Offset of a record in the heap.
+        :return: Decoded value of the record.
+        """
+
+        start = self._heap + offset
+        length = _U32.unpack_from(self._mmap, start)[0]
+        start += _U32.size
+
+        with memoryview(self._mmap) as view:
+            return decode_value(view[start:start + length])
+
+
+    def _read_slot(self, array_offset: int, index: int) -> object:
+        """
+        :param array_offset: File offset of the key offsets or value offsets array.
+        :param index: Slot index.
+        :return: Decoded key or value stored for the slot.
+        """
+
+        return self._read_record(_U64.unpack_from(self._mmap, array_offset + 8 * index)[0])
+
+
+    def _get_index_from_key(self, key: str) -> int:
+        """
+        :param key: String that maps to an integer index of the HashMap.
+        :return: Integer index associated with key.
+
+        Returns the slot index that matches the key, probing in the same order as the map that was saved.
+        Cached hashes are compared before keys, so only keys with an equal hash are decoded.
+        """
+
+        hash_value = self._hash_key(key)
+        capacity, mask = self._capacity, self._mask
+        data, states, hashes = self._mmap, self._states, self._hashes
+
+        initial_index = hash_value & mask if mask is not None else hash_value % capacity
+
+        for num in range(self._max_probe):
+            if mask is None:
+                index = (initial_index + (num * num)) % capacity
+            else:
+                index = (initial_index + ((num * num + num) >> 1)) & mask
+            state = data[states + index]
+
+            if state == EMPTY:
+                return None
+
+            if state == LIVE and _U64.unpack_from(data, hashes + 8 * index)[0] == hash_value:
+                if self._read_slot(self._keys, index) == key:
+                    return index
+
+        return None
+
+
+# ------------------- BASIC TESTING ---------------------------------------- #
+
+
+if __name__ == "__main__":
+
+    import os
+    import tempfile
+
+    print("\nwrite_table / MappedHashMap example 1")
+    print("-------------------------------------")
+    m = hash_map_oa.HashMap(53, 'fnv1a', seed=7)
+    for i in range(150):
+        m.put('str' + str(i), i * 100)
+    m.remove('str5')
+
+    path = os.path.join(tempfile.mkdtemp(), 'table.hmoa')
+    write_table(m, path)
+
+    with MappedHashMap(path) as mapped:
+        print(mapped.get_size(), mapped.get_capacity())
+        print(mapped.get('str10'), mapped.get('str5'), mapped.contains_key('str149'), 'str150' in mapped)
+        result = True
+        for key in m:
+            result &= mapped[key] == m[key]
+        print(result)
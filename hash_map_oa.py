@@ -6,139 +6,1082 @@
 #              are maintained at an O(1) time complexity. An iterator implementation was also included.
 
 
-from base_include import (DynamicArray, DynamicArrayException, HashEntry,
+from array import array
+from collections.abc import MutableMapping
+
+from base_include import (DynamicArray, DynamicArrayException, HashEntry, to_list, hash_many,
+                        hash_many_parallel, resolve_hash_function, mix_hash, mixed_hash_function,
+                        next_prime_capacity, MASK_64,
+                        HashMapKeysView, HashMapValuesView, HashMapItemsView,
+                        ITER_KEYS, ITER_VALUES,
+                        dump_snapshot, load_snapshot, SNAPSHOT_LAYOUT, SNAPSHOT_POWER_OF_TWO,
                         hash_function_1, hash_function_2)
 
-class HashMap:
-    def __init__(self, capacity: int, function) -> None:
+class HashMap(MutableMapping):
+    # Number of old-table slots moved to the new table on each put/get/remove
+    # while an incremental resize is in progress.
+    MIGRATION_STEP = 8
+
+    def __init__(self, capacity: int, function, incremental: bool = False, seed: int = None,
+                 power_of_two: bool = False) -> None:
+        """
+        Initialize new HashMap that uses
+        quadratic probing for collision resolution
+        function may be a hash function or the name of a registered one, built with seed.
+        If incremental is True, growing the table rehashes a few slots per operation
+        instead of the whole table at once.
+        If power_of_two is True, capacities are powers of two, slots are picked with a bitmask on
+        mixed hashes and probing uses triangular numbers, which visit every slot of such a table.
+        DO NOT CHANGE THE capacity AND function PARAMETERS IN ANY WAY
+        """
+        self._buckets = DynamicArray()
+
+        # capacity must be a prime number, or a power of two in power-of-two mode
+        self._mask = 0 if power_of_two else None
+        self._capacity = self._next_capacity(capacity)
+        for _ in range(self._capacity):
+            self._buckets.append(None)
+
+        if power_of_two:
+            self._mask = self._capacity - 1
+
+        self._hash_function = resolve_hash_function(function, seed)
+        self._size = 0
+
+        # Tombstones in the current table. They count towards the load that triggers a rebuild.
+        self._tombstones = 0
+
+        # Longest probe sequence used by any insert into the current table. Lookups never probe further.
+        self._max_probe = 0
+
+        # Hash applied to keys; power-of-two mode mixes the hash so its low bits are well spread.
+        self._hash_key = mixed_hash_function(self._hash_function) if power_of_two else self._hash_function
+
+        # Incremental resize state. _old_buckets is None unless a migration is in progress.
+        self._incremental = incremental
+        self._old_buckets = None
+        self._old_capacity = 0
+        self._old_mask = None
+        self._old_max_probe = 0
+        self._migrate_index = 0
+
+        # Bumped whenever keys are added or removed or entries move, so iterators can detect changes.
+        self._modcount = 0
+
+    def __str__(self) -> str:
+        """
+        Override string method to provide more readable output
+        DO NOT CHANGE THIS METHOD IN ANY WAY
+        """
+        out = ''
+        for i in range(self._buckets.length()):
+            out += str(i) + ': ' + str(self._buckets[i]) + '\n'
+        return out
+
+    def _next_capacity(self, capacity: int) -> int:
+        """
+        Return the table capacity to use for the requested capacity: the next power of two in
+        power-of-two mode, otherwise the next prime.
+        """
+        if self._mask is not None:
+            return 1 << max(capacity - 1, 1).bit_length()
+
+        return next_prime_capacity(capacity)
+
+    def get_size(self) -> int:
+        """
+        Return size of map
+        DO NOT CHANGE THIS METHOD IN ANY WAY
+        """
+        return self._size
+
+    def get_capacity(self) -> int:
+        """
+        Return capacity of map
+        DO NOT CHANGE THIS METHOD IN ANY WAY
+        """
+        return self._capacity
+
+    # ------------------------------------------------------------------ #
+
+
+    def put(self, key: str, value: object) -> object:
+        """
+        :param key: String that maps to an integer index of the HashMap.
+        :param value: Object to be added to the mapped location.
+        :return: Previous value paired to key, or None if key was not in the hash map.
+
+        Updates key-value pair in the hash map. If key is not in the hash map, adds new key-value pair.
+        Doubles HashMap table capacity before adding a key when live entries plus tombstones reach half
+        the table. If tombstones outnumber live entries, the table is compacted at the same capacity instead.
+        Updating an existing key never rebuilds the table.
+        """
+
+        return self._put(key, value, self._hash_key(key))
+
+
+    def _put(self, key: str, value: object, hash_value: int) -> object:
+        """
+        :param key: String that maps to an integer index of the HashMap.
+        :param value: Object to be added to the mapped location.
+        :param hash_value: Full hash of key, computed once by the caller.
+        :return: Previous value paired to key, or None if key was not in the hash map.
+
+        Performs put using an already computed hash.
+        """
+
+        return self._put_entry(key, value, hash_value)[1]
+
+
+    def _put_record(self, key: str, value: object, hash_value: int) -> HashEntry:
+        """
+        :param key: String that maps to an integer index of the HashMap.
+        :param value: Object to be added to the mapped location.
+        :param hash_value: Full hash of key, computed once by the caller.
+        :return: HashEntry holding key.
+
+        Performs put and returns the entry it wrote, so wrapping maps can update their per-record
+        fields without a second lookup. Entries keep their identity across rebuilds.
+        """
+
+        return self._put_entry(key, value, hash_value)[0]
+
+
+    def _put_entry(self, key: str, value: object, hash_value: int) -> tuple[HashEntry, object]:
+        """
+        :param key: String that maps to an integer index of the HashMap.
+        :param value: Object to be added to the mapped location.
+        :param hash_value: Full hash of key, computed once by the caller.
+        :return: Tuple (HashEntry holding key, previous value paired to key or None).
+
+        Performs put using an already computed hash, in a single probe pass. The first tombstone on
+        the probe sequence is remembered while probing continues for the key, so a key that is live
+        further along is updated in place instead of being inserted a second time.
+        """
+
+        if self._old_buckets is not None:
+            self._migrate_slots()
+
+        # Key may still be waiting in the old table during an incremental resize.
+        if self._old_buckets is not None:
+            hash_entry = self._get_old_entry(key, hash_value)
+
+            if hash_entry:
+                previous, hash_entry.value = hash_entry.value, value
+                return hash_entry, previous
+
+        # Find initial HashMap index.
+        capacity, mask = self._capacity, self._mask
+        initial_index = hash_value & mask if mask is not None else hash_value % capacity
+
+        free_index = free_num = None
+
+        # Use quadratic (or triangular) probe to find the key or an empty index.
+        for num in range(capacity):
+
+            # Once a tombstone is remembered, the key cannot lie past the longest insert probe.
+            if num >= self._max_probe and free_index is not None:
+                break
+
+            if mask is None:
+                index = (initial_index + (num * num)) % capacity
+            else:
+                index = (initial_index + ((num * num + num) >> 1)) & mask
+            hash_entry = self._buckets[index]
+
+            # Check if a HashEntry exist at index.
+            if hash_entry is None:
+                if free_index is None:
+                    free_index, free_num = index, num
+                break
+
+            # Remember the first tombstone.
+            elif hash_entry.is_tombstone:
+                if free_index is None:
+                    free_index, free_num = index, num
+
+            # Check if key already exist.
+            elif hash_entry.hash == hash_value and hash_entry.key == key:
+
+                # Replace existing value.
+                previous, hash_entry.value = hash_entry.value, value
+                return hash_entry, previous
+
+        # Check if a rebuild is needed. Tombstones lengthen probes just like live entries.
+        if (self._size + self._tombstones) / self._capacity >= 0.5:
+
+            if self._tombstones > self._size:
+                self._rebuild_table(self._capacity)
+            else:
+                self._rebuild_table(self._capacity * 2)
+
+            # The key is new, so it takes the first free slot of the rebuilt table.
+            hash_entry = HashEntry(key, value, hash_value)
+            self._move_entry(hash_entry)
+
+        else:
+            hash_entry = self._buckets[free_index]
+
+            if hash_entry is None:
+
+                # Create new HashEntry.
+                hash_entry = self._buckets[free_index] = HashEntry(key, value, hash_value)
+
+            else:
+
+                # Replace tombstone HashEntry information.
+                hash_entry.key = key
+                hash_entry.value = value
+                hash_entry.hash = hash_value
+                hash_entry.is_tombstone = False
+                self._tombstones -= 1
+
+            if free_num >= self._max_probe:
+                self._max_probe = free_num + 1
+
+        self._size += 1                                                 # Update self._size.
+        self._modcount += 1
+
+        return hash_entry, None
+
+
+    def resize_table(self, new_capacity: int) -> None:
+        """
+        :param new_capacity: Integer value of the HashMap table's new capacity.
+
+        Changes the underlying table's capacity. Active entries are moved to a new table using their
+        cached hashes.
+        new_capacity is rounded up to the next prime (the next power of two in power-of-two mode).
+        The capacity keeps doubling until the table can hold every entry below a 0.5 load factor.
+        """
+
+        # If new_capacity is less current elements in hash map, method does nothing.
+        if new_capacity < self._size:
+            return
+
+        # An explicit resize completes any incremental resize first.
+        self._finish_migration()
+
+        # Ensure new_capacity is a prime number (or a power of two).
+        new_capacity = self._next_capacity(new_capacity)
+
+        # Pre-size the table so the rebuild never has to grow again.
+        while (self._size - 1) / new_capacity >= 0.5:
+            new_capacity = self._next_capacity(new_capacity * 2)
+
+        # Store old information and create new HashMap table.
+        old_table, old_capacity = self._buckets, self._capacity
+        self._modcount += 1
+        self._buckets = DynamicArray()
+
+        for num in range(new_capacity):
+            self._buckets.append(None)
+
+        # Update capacity. The new table has no tombstones or probes yet.
+        self._capacity = new_capacity
+        self._tombstones = 0
+        self._max_probe = 0
+        if self._mask is not None:
+            self._mask = new_capacity - 1
+
+        # Visit each HashMap index from the old table.
+        for index in range(old_capacity):
+            hash_entry = old_table[index]
+
+            if hash_entry and hash_entry.is_tombstone is False:
+                # Move active entries to new table.
+                self._move_entry(hash_entry)
+
+
+    def table_load(self) -> float:
+        """
+        Returns the load factor of current HashMap table.
+        Load Factor = objects stored / number of buckets
+        """
+
+        return self._size / self._capacity
+
+
+    def empty_buckets(self) -> int:
+        """
+        :return: Integer of empty buckets.
+
+        Returns the number of empty buckets in the hash table.
+        """
+
+        self._finish_migration()
+
+        empty_buckets = 0
+
+        # Visit each HashMap index.
+        for index in range(self._capacity):
+
+            # Check for active hash entry.
+            if not self._buckets[index]:
+                empty_buckets += 1
+
+            # Check for active tombstone.
+            elif self._buckets[index].is_tombstone is True:
+                empty_buckets += 1
+
+        return empty_buckets
+
+
+    def get(self, key: str, default: object = None) -> object:
+        """
+        :param key: String that maps to an integer index of the HashMap.
+        :param default: Object returned when key is not in the hash map.
+        :return: Object paired to key.
+
+        Returns the value associated with the given key.
+        If the key is not in the hash map, the method returns default (None unless given).
+        """
+
+        hash_entry = self._get_entry_from_key(key)
+
+        if hash_entry:
+            return hash_entry.value
+
+        return default
+
+
+    def contains_key(self, key: str) -> bool:
+        """
+        :param key: String that maps to an integer index of the HashMap.
+        :return: True if key is in HashMap. False otherwise.
+
+        Returns True if the given key is in the hash map, otherwise it returns False.
+        An empty hash map does not contain any keys.
+        """
+
+        if self._get_entry_from_key(key):
+            return True
+
+        return False
+
+
+    def remove(self, key: str) -> None:
+        """
+        :param key: String that maps to an integer index of the HashMap.
+
+        Removes given key and its associated value from the hash map.
+        If the key is not in the hash map, the method does nothing.
+        """
+
+        self._remove(key, self._hash_key(key))
+
+
+    def _remove(self, key: str, hash_value: int) -> bool:
+        """
+        :param key: String that maps to an integer index of the HashMap.
+        :param hash_value: Full hash of key, computed once by the caller.
+        :return: True if key was removed. False if key was not in the hash map.
+
+        Performs remove using an already computed hash.
+        """
+
+        if self._old_buckets is not None:
+            self._migrate_slots()
+
+        index = self._get_index_from_key(key, hash_value)
+
+        if index is not None:
+
+            # Turn hash entry into tombstone.
+            self._buckets[index].is_tombstone = True
+
+            # Update self._size and the tombstone count.
+            self._size -= 1
+            self._tombstones += 1
+            self._modcount += 1
+            return True
+
+        # Tombstones left in the old table are dropped with it, so they are not counted.
+        if self._old_buckets is not None:
+            hash_entry = self._get_old_entry(key, hash_value)
+
+            if hash_entry:
+                hash_entry.is_tombstone = True
+                self._size -= 1
+                self._modcount += 1
+                return True
+
+        return False
+
+
+    def get_keys_and_values(self) -> DynamicArray:
+        """
+        :return: Dynamic array of key-value pairs.
+
+        Returns a dynamic array where each index contains a tuple of a key-value pair from the hash map.
+        """
+
+        self._finish_migration()
+
+        # Create new dynamic array.
+        contents_da = DynamicArray()
+
+        # Visit each HashMap index.
+        for index in range(self._capacity):
+            hash_entry = self._buckets[index]
+
+            # Check if hash map entry is empty or a tombstone
+            if hash_entry and hash_entry.is_tombstone is False:
+
+                # Append key-value pairs from HashEntry as tuples.
+                contents_da.append((hash_entry.key, hash_entry.value))
+
+        return contents_da
+
+
+    def clear(self) -> None:
+        """
+        Clears the contents of the hash map without changing the underlying table capacity.
+        """
+
+        # Point self._buckets to an empty dynamic array. Reset self._size.
+        self._buckets = DynamicArray()
+        self._size = 0
+        self._tombstones = 0
+        self._max_probe = 0
+        self._modcount += 1
+
+        # Drop any old table left over from an incremental resize.
+        self._old_buckets = None
+
+        # Add a none placeholder to each index, based on self._capacity.
+        for index in range(self._capacity):
+            self._buckets.append(None)
+
+
+    def put_many(self, pairs, workers: int = None) -> None:
+        """
+        :param pairs: DynamicArray or iterable of (key, value) tuples.
+        :param workers: Number of processes to hash the keys in. By default they are hashed in this process.
+
+        Puts every key-value pair in order. All keys are hashed up front and the table is resized
+        at most once, to fit the current size plus the number of pairs.
+        With workers, large batches are hashed in a process pool, one range of keys per worker, and the
+        pairs are then placed in a single pass.
+        """
+
+        pairs = to_list(pairs)
+        hashes = self._hash_many([pair[0] for pair in pairs], workers)
+
+        # Pre-size the table so the load factor stays below 0.5 for the whole batch.
+        count = self._size + len(pairs)
+        if (count - 1) / self._capacity >= 0.5:
+            self.resize_table(count * 2)
+
+        put = self._put
+        for (key, value), hash_value in zip(pairs, hashes):
+            put(key, value, hash_value)
+
+
+    def get_many(self, keys) -> DynamicArray:
+        """
+        :param keys: DynamicArray or iterable of keys.
+        :return: Dynamic array of values in the same order as keys.
+
+        Returns the value for each key, or None for keys that are not in the hash map.
+        """
+
+        keys = to_list(keys)
+        get_entry = self._get_entry_from_key
+        values_da = DynamicArray()
+
+        for key, hash_value in zip(keys, self._hash_many(keys)):
+            hash_entry = get_entry(key, hash_value)
+            values_da.append(hash_entry.value if hash_entry else None)
+
+        return values_da
+
+
+    def contains_many(self, keys) -> DynamicArray:
+        """
+        :param keys: DynamicArray or iterable of keys.
+        :return: Dynamic array of booleans in the same order as keys.
+
+        Returns whether each key is in the hash map.
+        """
+
+        keys = to_list(keys)
+        get_entry = self._get_entry_from_key
+        result_da = DynamicArray()
+
+        for key, hash_value in zip(keys, self._hash_many(keys)):
+            result_da.append(get_entry(key, hash_value) is not None)
+
+        return result_da
+
+
+    def remove_many(self, keys) -> None:
+        """
+        :param keys: DynamicArray or iterable of keys.
+
+        Removes every key in keys from the hash map. Keys that are not in the hash map are ignored.
+        """
+
+        keys = to_list(keys)
+        remove = self._remove
+
+        for key, hash_value in zip(keys, self._hash_many(keys)):
+            remove(key, hash_value)
+
+
+    # ---------------------- Snapshots ---------------------- #
+
+    def dump(self, fileobj, layout: bool = False) -> None:
+        """
+        :param fileobj: Binary file object opened for writing.
+        :param layout: If True, also save each entry's slot index and cached hash, and the tombstones.
+
+        Writes a binary snapshot of the hash map: a header with the capacity, size and hash function,
+        then length-prefixed key and value records. A layout snapshot loads without rehashing or probing.
+        """
+
+        self._finish_migration()
+
+        flags = SNAPSHOT_LAYOUT if layout else 0
+        if self._mask is not None:
+            flags |= SNAPSHOT_POWER_OF_TWO
+
+        def slots():
+            for index in range(self._capacity):
+                hash_entry = self._buckets[index]
+
+                if hash_entry is not None and (layout or hash_entry.is_tombstone is False):
+                    yield index, hash_entry.hash, hash_entry.key, hash_entry.value, hash_entry.is_tombstone
+
+        count = self._size + self._tombstones if layout else self._size
+        dump_snapshot(fileobj, self._hash_function, flags, self._capacity, self._size, self._max_probe,
+                      count, slots())
+
+
+    @classmethod
+    def load(cls, fileobj, function: callable = None, incremental: bool = False) -> "HashMap":
+        """
+        :param fileobj: Binary file object holding a snapshot written by dump.
+        :param function: Hash function to use. Defaults to the registered one saved in the snapshot.
+        :param incremental: Whether the loaded map resizes incrementally.
+        :return: New HashMap with the snapshot's contents and capacity.
+
+        Reads a snapshot. A layout snapshot puts entries straight back into their saved slots with their
+        saved hashes, so it must be loaded with the hash function it was written with.
+        """
+
+        function, flags, capacity, size, max_probe, slots = load_snapshot(fileobj, function)
+        hash_map = cls(capacity, function, incremental, power_of_two=bool(flags & SNAPSHOT_POWER_OF_TWO))
+
+        if not flags & SNAPSHOT_LAYOUT:
+            hash_map.put_many((key, value) for index, hash_value, key, value, tombstone in slots)
+            return hash_map
+
+        if hash_map._capacity != capacity:
+            raise ValueError('snapshot capacity is not a valid table capacity: ' + str(capacity))
+
+        buckets = hash_map._buckets
+        for index, hash_value, key, value, tombstone in slots:
+            hash_entry = HashEntry(key, value, hash_value)
+
+            if tombstone:
+                hash_entry.is_tombstone = True
+                hash_map._tombstones += 1
+
+            buckets[index] = hash_entry
+
+        hash_map._size = size
+        hash_map._max_probe = max_probe
+        return hash_map
+
+
+    def _hash_many(self, keys: list, workers: int = None) -> list:
+        """
+        :param keys: List of keys.
+        :param workers: Number of processes to hash the keys in, or None to hash them in this process.
+        :return: List of full hashes in the same order as keys.
+
+        Hashes a batch of keys with the map's hash function, vectorized when NumPy is available.
+        """
+
+        if workers is not None:
+            return hash_many_parallel(self._hash_function, keys, workers, self._mask is not None)
+
+        hashes = hash_many(self._hash_function, keys)
+
+        if self._mask is not None:
+            return list(map(mix_hash, hashes))
+
+        return hashes
+
+
+    # ---------------------- Mapping protocol ---------------------- #
+
+    def __getitem__(self, key: str) -> object:
+        """
+        Returns the value paired to key using [] syntax. Raises KeyError if key is not in the hash map.
+        """
+
+        hash_entry = self._get_entry_from_key(key)
+
+        if hash_entry is None:
+            raise KeyError(key)
+
+        return hash_entry.value
+
+
+    def __setitem__(self, key: str, value: object) -> None:
+        """
+        Adds or updates key-value pair using [] syntax.
+        """
+
+        self._put(key, value, self._hash_key(key))
+
+
+    def __delitem__(self, key: str) -> None:
+        """
+        Removes key using del syntax. Raises KeyError if key is not in the hash map.
+        """
+
+        if not self._remove(key, self._hash_key(key)):
+            raise KeyError(key)
+
+
+    def __contains__(self, key: str) -> bool:
+        """
+        Returns True if key is in the hash map, for use with the in operator.
+        """
+
+        return self._get_entry_from_key(key) is not None
+
+
+    def __len__(self) -> int:
+        """
+        Returns the number of key-value pairs in the hash map.
+        """
+
+        return self._size
+
+
+    def __iter__(self) -> "HashMapIterator":
+        """
+        Returns a new iterator over the keys in the hash map.
+        """
+
+        return HashMapIterator(self, ITER_KEYS)
+
+
+    def keys(self) -> HashMapKeysView:
+        """
+        Returns a live view of the keys that walks the table without copying it.
+        """
+
+        return HashMapKeysView(self)
+
+
+    def values(self) -> HashMapValuesView:
+        """
+        Returns a live view of the values that walks the table without copying it.
+        """
+
+        return HashMapValuesView(self)
+
+
+    def items(self) -> HashMapItemsView:
+        """
+        Returns a live view of the (key, value) pairs that walks the table without copying it.
+        """
+
+        return HashMapItemsView(self)
+
+
+    def _iterator(self, kind: int) -> "HashMapIterator":
+        """
+        :param kind: ITER_KEYS, ITER_VALUES or ITER_ITEMS.
+        :return: New iterator over the hash map.
+
+        Creates the iterator used by the map's views.
+        """
+
+        return HashMapIterator(self, kind)
+
+
+    def _get_index_from_key(self, key: str, hash_value: int) -> int:
         """
-        Initialize new HashMap that uses
-        quadratic probing for collision resolution
-        DO NOT CHANGE THIS METHOD IN ANY WAY
+        :param key: String that maps to an integer index of the HashMap.
+        :param hash_value: Full hash of key.
+        :return: Integer index associated with key.
+
+        Returns the HashMap index that matches the key using quadratic probing.
+        Cached hashes are compared before keys. The probe stops at the first never-used slot,
+        since an insert never skips one, and never goes past the longest insert probe.
+        """
+
+        capacity, mask = self._capacity, self._mask
+        initial_index = hash_value & mask if mask is not None else hash_value % capacity
+
+        for num in range(self._max_probe):
+            if mask is None:
+                index = (initial_index + (num * num)) % capacity
+            else:
+                index = (initial_index + ((num * num + num) >> 1)) & mask
+            hash_entry = self._buckets[index]
+
+            # Check if hash map index is empty.
+            if hash_entry is None:
+                return None
+
+            # Skip tombstones and check for key.
+            if hash_entry.is_tombstone is False:
+                if hash_entry.hash == hash_value and hash_entry.key == key:
+                    return index
+
+        return None
+
+
+    def _get_entry_from_key(self, key: str, hash_value: int = None) -> HashEntry:
+        """
+        :param key: String that maps to an integer index of the HashMap.
+        :param hash_value: Full hash of key. Computed from key if not given.
+        :return: Active HashEntry associated with key.
+
+        Returns the active HashEntry that matches the key, checking the old table during an incremental
+        resize. If key is not found, returns None.
+        """
+
+        if self._old_buckets is not None:
+            self._migrate_slots()
+
+        if hash_value is None:
+            hash_value = self._hash_key(key)
+        index = self._get_index_from_key(key, hash_value)
+
+        if index is not None:
+            return self._buckets[index]
+
+        if self._old_buckets is not None:
+            return self._get_old_entry(key, hash_value)
+
+        return None
+
+
+    def _get_old_entry(self, key: str, hash_value: int) -> HashEntry:
         """
+        :param key: String that maps to an integer index of the HashMap.
+        :param hash_value: Hash of key.
+        :return: Active HashEntry associated with key in the old table.
+
+        Probes the old table, skipping slots that have already been migrated. Migrated slots keep their
+        entries, so the probe can still stop at the first never-used slot.
+        """
+
+        capacity, mask = self._old_capacity, self._old_mask
+        initial_index = hash_value & mask if mask is not None else hash_value % capacity
+
+        for num in range(self._old_max_probe):
+            if mask is None:
+                index = (initial_index + (num * num)) % capacity
+            else:
+                index = (initial_index + ((num * num + num) >> 1)) & mask
+            hash_entry = self._old_buckets[index]
+
+            if hash_entry is None:
+                return None
+
+            # Slots below the migration index have already moved to the new table.
+            if index >= self._migrate_index and hash_entry and hash_entry.is_tombstone is False:
+                if hash_entry.hash == hash_value and hash_entry.key == key:
+                    return hash_entry
+
+        return None
+
+
+    def _rebuild_table(self, new_capacity: int) -> None:
+        """
+        :param new_capacity: Integer value of the rebuilt table's capacity.
+
+        Rebuilds the table at new_capacity, which is the current capacity when compacting tombstones.
+        In incremental mode, a new table is allocated and the old slots are moved over a few at a time
+        by later operations.
+        """
+
+        if not self._incremental:
+            self.resize_table(new_capacity)
+            return
+
+        # Only one migration runs at a time.
+        self._finish_migration()
+
+        # Keep the old table alive and start with an empty new table.
+        self._old_buckets, self._old_capacity = self._buckets, self._capacity
+        self._old_mask = self._mask
+        self._old_max_probe = self._max_probe
+        self._modcount += 1
+        self._migrate_index = 0
+
+        self._capacity = self._next_capacity(new_capacity)
+        self._tombstones = 0
+        self._max_probe = 0
+        if self._mask is not None:
+            self._mask = self._capacity - 1
         self._buckets = DynamicArray()
 
-        # capacity must be a prime number
-        self._capacity = self._next_prime(capacity)
-        for _ in range(self._capacity):
+        for index in range(self._capacity):
             self._buckets.append(None)
 
-        self._hash_function = function
-        self._size = 0
 
-    def __str__(self) -> str:
+    def _migrate_slots(self, count: int = None) -> None:
         """
-        Override string method to provide more readable output
-        DO NOT CHANGE THIS METHOD IN ANY WAY
+        :param count: Number of old slots to move. Defaults to MIGRATION_STEP.
+
+        Moves the active entries of the next old slots into the new table. Ends the migration once
+        every old slot has been visited.
         """
-        out = ''
-        for i in range(self._buckets.length()):
-            out += str(i) + ': ' + str(self._buckets[i]) + '\n'
-        return out
 
-    def _next_prime(self, capacity: int) -> int:
+        if count is None:
+            count = self.MIGRATION_STEP
+
+        stop = min(self._migrate_index + count, self._old_capacity)
+
+        for old_index in range(self._migrate_index, stop):
+            hash_entry = self._old_buckets[old_index]
+
+            if hash_entry and hash_entry.is_tombstone is False:
+                self._move_entry(hash_entry)
+
+        self._migrate_index = stop
+
+        if stop == self._old_capacity:
+            self._old_buckets = None
+
+
+    def _move_entry(self, hash_entry: HashEntry) -> None:
         """
-        Increment from given number to find the closest prime number
-        DO NOT CHANGE THIS METHOD IN ANY WAY
+        :param hash_entry: Active HashEntry whose key is not in the current table.
+
+        Places an entry into the current table using its cached hash. Keys are already unique,
+        so the entry takes the first free slot of its probe sequence and self._size is unchanged.
         """
-        if capacity % 2 == 0:
-            capacity += 1
 
-        while not self._is_prime(capacity):
-            capacity += 2
+        capacity, mask = self._capacity, self._mask
+        initial_index = hash_entry.hash & mask if mask is not None else hash_entry.hash % capacity
+
+        for num in range(capacity):
+            if mask is None:
+                index = (initial_index + (num * num)) % capacity
+            else:
+                index = (initial_index + ((num * num + num) >> 1)) & mask
+            slot = self._buckets[index]
+
+            if slot is None or slot.is_tombstone:
+                self._buckets[index] = hash_entry
+                if num >= self._max_probe:
+                    self._max_probe = num + 1
+
+                # Only tombstones left by removes during an incremental resize can be met here.
+                if slot is not None:
+                    self._tombstones -= 1
+                return
 
-        return capacity
 
-    @staticmethod
-    def _is_prime(capacity: int) -> bool:
+    def _finish_migration(self) -> None:
         """
-        Determine if given integer is a prime number and return boolean
-        DO NOT CHANGE THIS METHOD IN ANY WAY
+        Moves every remaining old slot into the new table.
         """
-        if capacity == 2 or capacity == 3:
-            return True
 
-        if capacity == 1 or capacity % 2 == 0:
-            return False
+        if self._old_buckets is not None:
+            self._migrate_slots(self._old_capacity)
+
+
+class HashMapIterator:
+    """
+    Separate iterator class for HashMap
+    Keeps its own cursor, so any number of iterators can walk the same map at once. Entries are read
+    straight from the table. Adding or removing a key, or rebuilding the table, while an iterator
+    is in use makes its next step raise RuntimeError.
+    """
+
+    def __init__(self, hash_map: HashMap, kind: int = ITER_KEYS) -> None:
+        """Initialize the iterator at the first slot. Any incremental resize is finished first."""
+        hash_map._finish_migration()
+
+        self._map = hash_map
+        self._buckets = hash_map._buckets
+        self._capacity = hash_map._capacity
+        self._modcount = hash_map._modcount
+        self._kind = kind
+        self._index = 0
+
+    def __iter__(self) -> "HashMapIterator":
+        """Return the iterator."""
+        return self
+
+    def __next__(self) -> object:
+        """Obtain the key, value or pair of the next active entry and advance iterator."""
+
+        if self._map._modcount != self._modcount:
+            raise RuntimeError("HashMap changed during iteration")
+
+        buckets, index = self._buckets, self._index
+
+        # Skip empty slots and tombstones.
+        while index < self._capacity:
+            hash_entry = buckets[index]
+            index += 1
+
+            if hash_entry is not None and hash_entry.is_tombstone is False:
+                self._index = index
+
+                if self._kind == ITER_KEYS:
+                    return hash_entry.key
+                if self._kind == ITER_VALUES:
+                    return hash_entry.value
+                return hash_entry.key, hash_entry.value
+
+        self._index = index
+        raise StopIteration
+
+
+# Slot states for ArrayHashMap.
+EMPTY, LIVE, TOMBSTONE = 0, 1, 2
+
+
+class ArrayHashMap(MutableMapping):
+    """
+    Open addressing HashMap with quadratic probing that stores its table as parallel flat arrays
+    (keys, values, cached hashes and a one byte state per slot) instead of one HashEntry per slot.
+    Cached hashes are narrowed to 64 bits and packed into an unsigned 64-bit array, which leaves the
+    output of every registered hash function unchanged.
+    Supports the same put, get, contains_key, remove and get_keys_and_values methods as HashMap.
+    """
 
-        factor = 3
-        while factor ** 2 <= capacity:
-            if capacity % factor == 0:
-                return False
-            factor += 2
+    def __init__(self, capacity: int, function, seed: int = None) -> None:
+        """
+        Initialize new ArrayHashMap that uses
+        quadratic probing for collision resolution
+        function may be a hash function or the name of a registered one, built with seed.
+        """
+        self._capacity = next_prime_capacity(capacity)
+        self._hash_function = resolve_hash_function(function, seed)
+        self._size = 0
+        self._tombstones = 0
+        self._modcount = 0
+        self._allocate(self._capacity)
 
-        return True
+    def __str__(self) -> str:
+        """
+        Override string method to provide more readable output
+        """
+        out = ''
+        for i in range(self._capacity):
+            state = self._states[i]
+
+            if state == EMPTY:
+                out += str(i) + ': None\n'
+            else:
+                out += (str(i) + ': K: ' + str(self._keys[i]) + ' V: ' + str(self._values[i]) +
+                        ' TS: ' + str(state == TOMBSTONE) + '\n')
+        return out
 
     def get_size(self) -> int:
         """
         Return size of map
-        DO NOT CHANGE THIS METHOD IN ANY WAY
         """
         return self._size
 
     def get_capacity(self) -> int:
         """
         Return capacity of map
-        DO NOT CHANGE THIS METHOD IN ANY WAY
         """
         return self._capacity
 
     # ------------------------------------------------------------------ #
 
 
-    def put(self, key: str, value: object) -> None:
+    def put(self, key: str, value: object) -> object:
         """
         :param key: String that maps to an integer index of the HashMap.
         :param value: Object to be added to the mapped location.
+        :return: Previous value paired to key, or None if key was not in the hash map.
 
         Updates key-value pair in the hash map. If key is not in the hash map, adds new key-value pair.
-        Doubles HashMap table capacity when load factor is greater or equal to 0.5.
+        Adding a key doubles HashMap table capacity when live entries plus tombstones reach half the table.
+        If tombstones outnumber live entries, the table is compacted at the same capacity instead.
         """
 
-        # Check if resize is needed.
-        if self.table_load() >= 0.5:
-            self.resize_table(self._capacity * 2)
+        hash_value = self._hash_function(key) & MASK_64
+        capacity = self._capacity
+        states, keys, hashes = self._states, self._keys, self._hashes
 
-        # Find initial HashMap index.
-        hash_value = self._hash_function(key)
-        initial_index = hash_value % self._capacity
-
-        # Use quadratic probe to find available index.
-        for num in range(self._capacity):
-            index = (initial_index + (num * num)) % self._capacity
+        initial_index = hash_value % capacity
+        free_index = free_num = None
 
-            # Check if a HashEntry exist at index.
-            if self._buckets[index] is None:
+        # Probe until the key or an empty slot is found, remembering the first tombstone.
+        # Once a tombstone is remembered, the key cannot lie past the longest insert probe.
+        for num in range(capacity):
+            if num >= self._max_probe and free_index is not None:
+                break
 
-                # Create new HashEntry.
-                self._buckets[index] = HashEntry(key, value)
-                self._size += 1                                         # Update self._size.
-                return
+            index = (initial_index + (num * num)) % capacity
+            state = states[index]
 
-            # Check if index has a tombstone.
-            elif self._buckets[index].is_tombstone:
+            if state == EMPTY:
+                if free_index is None:
+                    free_index, free_num = index, num
+                break
 
-                # Replace HashEntry information.
-                self._buckets[index].key = key
-                self._buckets[index].value = value
-                self._buckets[index].is_tombstone = False
-                self._size += 1                                         # Update self._size.
-                return
+            if state == TOMBSTONE:
+                if free_index is None:
+                    free_index, free_num = index, num
 
-            # Check if key already exist.
-            elif self._buckets[index].key == key:
+            elif hashes[index] == hash_value and keys[index] == key:
 
                 # Replace existing value.
-                self._buckets[index].value = value
-                return
+                previous, self._values[index] = self._values[index], value
+                return previous
+
+        # Check if a rebuild is needed. Tombstones lengthen probes just like live entries.
+        if (self._size + self._tombstones) / capacity >= 0.5:
+
+            if self._tombstones > self._size:
+                self.resize_table(capacity)
+            else:
+                self.resize_table(capacity * 2)
+
+            # The key is new, so it takes the first empty slot of the rebuilt table.
+            capacity, states = self._capacity, self._states
+            initial_index = hash_value % capacity
+
+            for num in range(capacity):
+                index = (initial_index + (num * num)) % capacity
+
+                if states[index] == EMPTY:
+                    free_index, free_num = index, num
+                    break
+
+        # Store new key-value pair in the first reusable slot.
+        if states[free_index] == TOMBSTONE:
+            self._tombstones -= 1
+
+        if free_num >= self._max_probe:
+            self._max_probe = free_num + 1
+
+        states[free_index] = LIVE
+        self._keys[free_index] = key
+        self._hashes[free_index] = hash_value
+        self._values[free_index] = value
+        self._size += 1
+        self._modcount += 1
+
+        return None
 
 
     def resize_table(self, new_capacity: int) -> None:
         """
         :param new_capacity: Integer value of the HashMap table's new capacity.
 
-        Changes the underlying table's capacity. Active key-values are rehashed and put into a new table.
-        If new_capacity is not a prime number, it will be set to the next highest prime number.
+        Changes the underlying table's capacity. Active key-values are moved into new arrays using
+        their cached hashes. new_capacity is rounded up to the next prime.
         """
 
         # If new_capacity is less current elements in hash map, method does nothing.
@@ -146,27 +1089,38 @@ class HashMap:
             return
 
         # Ensure new_capacity is a prime number.
-        if not self._is_prime(new_capacity):
-            new_capacity = self._next_prime(new_capacity)
-
-        # Store old information and create new HashMap table.
-        old_table, old_capacity = self._buckets, self._capacity
-        self._buckets = DynamicArray()
+        new_capacity = next_prime_capacity(new_capacity)
 
-        for num in range(new_capacity):
-            self._buckets.append(None)
+        # Pre-size the table so the rebuild never has to grow again.
+        while (self._size - 1) / new_capacity >= 0.5:
+            new_capacity = next_prime_capacity(new_capacity * 2)
 
-        # Update capacity and size.
+        old_states, old_keys, old_values, old_hashes = self._states, self._keys, self._values, self._hashes
         self._capacity = new_capacity
-        self._size = 0
+        self._allocate(new_capacity)
 
-        # Visit each HashMap index from the old table.
-        for index in range(old_capacity):
-            hash_entry = old_table[index]
+        states, keys, values, hashes = self._states, self._keys, self._values, self._hashes
 
-            if hash_entry and hash_entry.is_tombstone is False:
-                # Rehash active key-values to new table.
-                self.put(hash_entry.key, hash_entry.value)
+        # Keys are unique, so each live entry goes into the first empty slot of its probe sequence.
+        for old_index, state in enumerate(old_states):
+            if state != LIVE:
+                continue
+
+            hash_value = old_hashes[old_index]
+            initial_index = hash_value % new_capacity
+
+            for num in range(new_capacity):
+                index = (initial_index + (num * num)) % new_capacity
+
+                if states[index] == EMPTY:
+                    if num >= self._max_probe:
+                        self._max_probe = num + 1
+
+                    states[index] = LIVE
+                    keys[index] = old_keys[old_index]
+                    values[index] = old_values[old_index]
+                    hashes[index] = hash_value
+                    break
 
 
     def table_load(self) -> float:
@@ -182,40 +1136,28 @@ class HashMap:
         """
         :return: Integer of empty buckets.
 
-        Returns the number of empty buckets in the hash table.
+        Returns the number of empty buckets (unused slots and tombstones) in the hash table.
         """
 
-        empty_buckets = 0
-
-        # Visit each HashMap index.
-        for index in range(self._capacity):
-
-            # Check for active hash entry.
-            if not self._buckets[index]:
-                empty_buckets += 1
-
-            # Check for active tombstone.
-            elif self._buckets[index].is_tombstone is True:
-                empty_buckets += 1
-
-        return empty_buckets
+        return self._capacity - self._size
 
 
-    def get(self, key: str) -> object:
+    def get(self, key: str, default: object = None) -> object:
         """
         :param key: String that maps to an integer index of the HashMap.
+        :param default: Object returned when key is not in the hash map.
         :return: Object paired to key.
 
         Returns the value associated with the given key.
-        If the key is not in the hash map, the method returns None.
+        If the key is not in the hash map, the method returns default (None unless given).
         """
 
         index = self._get_index_from_key(key)
 
         if index is not None:
-            return self._buckets[index].value
+            return self._values[index]
 
-        return None
+        return default
 
 
     def contains_key(self, key: str) -> bool:
@@ -224,15 +1166,9 @@ class HashMap:
         :return: True if key is in HashMap. False otherwise.
 
         Returns True if the given key is in the hash map, otherwise it returns False.
-        An empty hash map does not contain any keys.
         """
 
-        index = self._get_index_from_key(key)
-
-        if index is not None:
-            return True
-
-        return False
+        return self._get_index_from_key(key) is not None
 
 
     def remove(self, key: str) -> None:
@@ -246,12 +1182,7 @@ class HashMap:
         index = self._get_index_from_key(key)
 
         if index is not None:
-
-            # Turn hash entry into tombstone.
-            self._buckets[index].is_tombstone = True
-
-            # Update self._size.
-            self._size -= 1
+            self._remove_at(index)
 
 
     def get_keys_and_values(self) -> DynamicArray:
@@ -261,18 +1192,12 @@ class HashMap:
         Returns a dynamic array where each index contains a tuple of a key-value pair from the hash map.
         """
 
-        # Create new dynamic array.
         contents_da = DynamicArray()
+        keys, values = self._keys, self._values
 
-        # Visit each HashMap index.
-        for index in range(self._capacity):
-            hash_entry = self._buckets[index]
-
-            # Check if hash map entry is empty or a tombstone
-            if hash_entry and hash_entry.is_tombstone is False:
-
-                # Append key-value pairs from HashEntry as tuples.
-                contents_da.append((hash_entry.key, hash_entry.value))
+        for index, state in enumerate(self._states):
+            if state == LIVE:
+                contents_da.append((keys[index], values[index]))
 
         return contents_da
 
@@ -282,39 +1207,99 @@ class HashMap:
         Clears the contents of the hash map without changing the underlying table capacity.
         """
 
-        # Point self._buckets to an empty dynamic array. Reset self._size.
-        self._buckets = DynamicArray()
         self._size = 0
+        self._allocate(self._capacity)
 
-        # Add a none placeholder to each index, based on self._capacity.
-        for index in range(self._capacity):
-            self._buckets.append(None)
 
+    # ---------------------- Mapping protocol ---------------------- #
 
-    def __iter__(self):
+    def __getitem__(self, key: str) -> object:
         """
-        Creates iterator for HashMap loop.
+        Returns the value paired to key using [] syntax. Raises KeyError if key is not in the hash map.
         """
 
-        self._index = 0
+        index = self._get_index_from_key(key)
 
-        return self
+        if index is None:
+            raise KeyError(key)
+
+        return self._values[index]
 
 
-    def __next__(self):
+    def __setitem__(self, key: str, value: object) -> None:
         """
-        Returns next value in HashMap and advances the iterator.
+        Adds or updates key-value pair using [] syntax.
         """
 
-        for num in range(self._index, self._capacity):
-            hash_entry = self._buckets[num]
-            self._index += 1
+        self.put(key, value)
 
-            # Check if hash_entry exists or a tombstone.
-            if hash_entry is not None and hash_entry.is_tombstone is False:
-                return hash_entry
 
-        raise StopIteration
+    def __delitem__(self, key: str) -> None:
+        """
+        Removes key using del syntax. Raises KeyError if key is not in the hash map.
+        """
+
+        index = self._get_index_from_key(key)
+
+        if index is None:
+            raise KeyError(key)
+
+        self._remove_at(index)
+
+
+    def __contains__(self, key: str) -> bool:
+        """
+        Returns True if key is in the hash map, for use with the in operator.
+        """
+
+        return self._get_index_from_key(key) is not None
+
+
+    def __len__(self) -> int:
+        """
+        Returns the number of key-value pairs in the hash map.
+        """
+
+        return self._size
+
+
+    def __iter__(self) -> "ArrayHashMapIterator":
+        """
+        Returns an iterator over the keys in the hash map.
+        """
+
+        return ArrayHashMapIterator(self)
+
+
+    def _remove_at(self, index: int) -> None:
+        """
+        :param index: Slot of the entry to remove.
+
+        Marks the slot as a tombstone and releases its key and value.
+        """
+
+        self._states[index] = TOMBSTONE
+        self._keys[index] = None
+        self._values[index] = None
+        self._size -= 1
+        self._tombstones += 1
+        self._modcount += 1
+
+
+    def _allocate(self, capacity: int) -> None:
+        """
+        :param capacity: Number of slots.
+
+        Creates empty slot arrays of the given capacity.
+        """
+
+        self._tombstones = 0
+        self._max_probe = 0
+        self._modcount += 1
+        self._states = bytearray(capacity)
+        self._keys = [None] * capacity
+        self._values = [None] * capacity
+        self._hashes = array('Q', bytes(8 * capacity))
 
 
     def _get_index_from_key(self, key: str) -> int:
@@ -322,21 +1307,67 @@ class HashMap:
         :param key: String that maps to an integer index of the HashMap.
         :return: Integer index associated with key.
 
-        Returns the HashMap index that matches the key using quadratic probing.
+        Returns the slot index that matches the key using quadratic probing. The probe stops at the
+        first empty slot, since an insert never skips one, and never goes past the longest insert probe.
         """
 
-        hash_value = self._hash_function(key)
-        initial_index = hash_value % self._capacity
+        hash_value = self._hash_function(key) & MASK_64
+        capacity = self._capacity
+        states, keys, hashes = self._states, self._keys, self._hashes
 
-        for num in range(self._capacity):
-            index = (initial_index + (num * num)) % self._capacity
+        initial_index = hash_value % capacity
 
-            # Check if hash map index is empty or a tombstone.
-            if self._buckets[index] and self._buckets[index].is_tombstone is False:
+        for num in range(self._max_probe):
+            index = (initial_index + (num * num)) % capacity
+            state = states[index]
 
-                # Check for key.
-                if self._buckets[index].key == key:
-                    return index
+            if state == EMPTY:
+                return None
+
+            if state == LIVE and hashes[index] == hash_value and keys[index] == key:
+                return index
+
+        return None
+
+
+class ArrayHashMapIterator:
+    """
+    Separate iterator class for ArrayHashMap
+    Keeps its own cursor into the slot arrays. Adding or removing a key, or rebuilding the table,
+    while an iterator is in use makes its next step raise RuntimeError.
+    """
+
+    def __init__(self, hash_map: ArrayHashMap) -> None:
+        """Initialize the iterator at the first slot."""
+        self._map = hash_map
+        self._states = hash_map._states
+        self._keys = hash_map._keys
+        self._modcount = hash_map._modcount
+        self._index = 0
+
+    def __iter__(self) -> "ArrayHashMapIterator":
+        """Return the iterator."""
+        return self
+
+    def __next__(self) -> object:
+        """Obtain the key of the next live slot and advance iterator."""
+
+        if self._map._modcount != self._modcount:
+            raise RuntimeError("HashMap changed during iteration")
+
+        states, index = self._states, self._index
+
+        # Skip empty slots and tombstones.
+        while index < len(states):
+            state = states[index]
+            index += 1
+
+            if state == LIVE:
+                self._index = index
+                return self._keys[index - 1]
+
+        self._index = index
+        raise StopIteration
 
 
 # ------------------- BASIC TESTING ---------------------------------------- #
@@ -529,16 +1560,16 @@ if __name__ == "__main__":
     m.clear()
     print(m.get_size(), m.get_capacity())
 
-    print("\nPDF - __iter__(), __next__() example 1")
+    print("\nPDF - __iter__() example 1")
     print("---------------------")
     m = HashMap(10, hash_function_1)
     for i in range(5):
         m.put(str(i), str(i * 10))
     print(m)
-    for item in m:
-        print('K:', item.key, 'V:', item.value)
+    for key in m:
+        print('K:', key, 'V:', m[key])
 
-    print("\nPDF - __iter__(), __next__() example 2")
+    print("\nPDF - __iter__() example 2")
     print("---------------------")
     m = HashMap(10, hash_function_2)
     for i in range(5):
@@ -546,7 +1577,76 @@ if __name__ == "__main__":
     m.remove('0')
     m.remove('4')
     print(m)
-    for item in m:
-        print('K:', item.key, 'V:', item.value)
+    for key in m:
+        print('K:', key, 'V:', m[key])
+
+    print("\nArrayHashMap example 1")
+    print("---------------------")
+    m = ArrayHashMap(11, hash_function_2)
+    for i in range(50):
+        m.put('str' + str(i), i * 100)
+    m.remove('str7')
+    print(m.get_size(), m.get_capacity(), m.get('str8'), m.contains_key('str7'), m.empty_buckets())
 
+    print("\nincremental resize example 1")
+    print("----------------------------")
+    m = HashMap(53, hash_function_1, incremental=True)
+    half = m.get_capacity() // 2 + 1
+    for i in range(half):
+        m.put('str' + str(i), i)
+    for i in range(half, half + 7):
+        m.put('str' + str(i), i)
+        migrating = m._old_buckets is not None
+        print(m.get_size(), m.get_capacity(), migrating, m.get('str0'), m.get('str' + str(i)))
+
+    print("\nput_many / get_many example 1")
+    print("-----------------------------")
+    m = HashMap(11, hash_function_2)
+    m.put_many(('key' + str(i), i * 10) for i in range(20))
+    print(m.get_size(), m.get_capacity())
+    print(m.get_many(['key3', 'key19', 'key20']))
+    print(m.contains_many(DynamicArray(['key0', 'key20'])))
+    m.remove_many('key' + str(i) for i in range(0, 20, 2))
+    print(m.get_size(), m.get_many(['key2', 'key3']))
 
+    print("\ntombstone compaction example 1")
+    print("------------------------------")
+    m = HashMap(101, hash_function_1)
+    for i in range(1000):
+        m.put('key' + str(i), i)
+        if i >= 20:
+            m.remove('key' + str(i - 20))
+        if i % 200 == 199:
+            print(m.get_size(), m.get_capacity(), m.get('key' + str(i)), m.contains_key('key' + str(i - 20)))
+
+    print("\nput past a tombstone example 1")
+    print("------------------------------")
+    m = HashMap(11, hash_function_1)
+    m.put('ab', 1)
+    m.put('ba', 2)
+    m.remove('ab')
+    print(m.get_size(), m.put('ba', 3), m.get_size(), m.get('ba'))
+    m.remove('ba')
+    print(m.get_size(), m.contains_key('ba'))
+
+    print("\ndump / load example 1")
+    print("---------------------")
+    import io
+    m = HashMap(11, hash_function_1)
+    for i in range(30):
+        m.put('key' + str(i), i * 3)
+    m.remove('key5')
+    for layout in (False, True):
+        snapshot = io.BytesIO()
+        m.dump(snapshot, layout=layout)
+        snapshot.seek(0)
+        loaded = HashMap.load(snapshot)
+        print(layout, loaded.get_size(), loaded.get_capacity(), loaded.get('key7'), loaded.contains_key('key5'),
+              dict(loaded.items()) == dict(m.items()))
+
+    print("\nput_many workers example 1")
+    print("--------------------------")
+    pairs = [('key' + str(i), i) for i in range(100000)]
+    m = HashMap(11, hash_function_2)
+    m.put_many(pairs, workers=2)
+    print(m.get_size(), m.get('key4321'), m.contains_key('key100000'))
@@ -0,0 +1,511 @@
+# Description: HashMap with an ordered companion index. OrderedHashMap stores its entries in a separate chaining
+#              or open addressing HashMap, so point lookups keep their O(1) hash path, and keeps the keys in a
+#              SortedKeyIndex: sorted blocks of a few hundred keys with a list of each block's largest key. A
+#              binary search over the block maxima and then within one block finds any position in O(log n),
+#              so range, prefix, min and max queries cost O(log n + k) instead of a full table scan and sort.
+#              The index holds each key next to the map's own SLNode or HashEntry record, so range results
+#              read values without hashing the keys again.
+
+
+from bisect import bisect_left
+from collections.abc import MutableMapping
+
+from base_include import (DynamicArray, HashMapKeysView, HashMapValuesView, HashMapItemsView,
+                        ITER_KEYS, ITER_VALUES, hash_function_1, hash_function_2)
+import hash_map_oa
+import hash_map_sc
+
+
+class SortedKeyIndex:
+    """
+    Sorted keys kept in blocks of about LOAD keys, each key paired with a record.
+    A block that grows past 2 * LOAD keys is split in half, and a block that shrinks below LOAD // 4 keys
+    is merged into a neighbour. Keys must be orderable with each other.
+    Supported methods are: add, discard, position, walk, first, last, length
+    """
+
+    LOAD = 256
+
+    def __init__(self) -> None:
+        """
+        Initialize an empty index.
+        """
+        self._keys = []
+        self._records = []
+        self._maxes = []
+        self._size = 0
+
+    def length(self) -> int:
+        """
+        Return the number of keys in the index
+        """
+        return self._size
+
+    def add(self, key: object, record: object) -> None:
+        """
+        :param key: Key that is not in the index yet.
+        :param record: Record to keep with the key.
+
+        Inserts the key in sorted position.
+        """
+
+        if not self._keys:
+            self._keys.append([key])
+            self._records.append([record])
+            self._maxes.append(key)
+            self._size = 1
+            return
+
+        block_index = min(bisect_left(self._maxes, key), len(self._maxes) - 1)
+        keys, records = self._keys[block_index], self._records[block_index]
+        position = bisect_left(keys, key)
+
+        keys.insert(position, key)
+        records.insert(position, record)
+        self._maxes[block_index] = keys[-1]
+        self._size += 1
+
+        if len(keys) > 2 * self.LOAD:
+            self._split(block_index)
+
+    def discard(self, key: object) -> object:
+        """
+        :param key: Key to remove.
+        :return: Record kept with the key, or None if the key is not in the index.
+        """
+
+        block_index, position = self.position(key)
+
+        if block_index == len(self._keys) or self._keys[block_index][position] != key:
+            return None
+
+        keys, records = self._keys[block_index], self._records[block_index]
+        del keys[position]
+        record = records.pop(position)
+        self._size -= 1
+
+        if not keys:
+            del self._keys[block_index], self._records[block_index], self._maxes[block_index]
+        else:
+            self._maxes[block_index] = keys[-1]
+            if len(keys) < self.LOAD // 4 and len(self._keys) > 1:
+                self._merge(block_index)
+
+        return record
+
+    def position(self, key: object) -> tuple:
+        """
+        :param key: Key to search for.
+        :return: Tuple (block index, position in block) of the first key not less than key. The block index
+                 equals the number of blocks when every key is smaller.
+        """
+
+        block_index = bisect_left(self._maxes, key)
+        if block_index == len(self._keys):
+            return block_index, 0
+        return block_index, bisect_left(self._keys[block_index], key)
+
+    def walk(self, block_index: int, position: int):
+        """
+        :param block_index: Block to start in.
+        :param position: Position in that block to start at.
+        :return: Generator of (key, record) pairs in key order from the starting position.
+        """
+
+        blocks, block_records = self._keys, self._records
+
+        while block_index < len(blocks):
+            keys, records = blocks[block_index], block_records[block_index]
+
+            for index in range(position, len(keys)):
+                yield keys[index], records[index]
+
+            block_index, position = block_index + 1, 0
+
+    def first(self) -> tuple:
+        """
+        Return the (key, record) pair with the smallest key, or None if the index is empty
+        """
+        if not self._keys:
+            return None
+        return self._keys[0][0], self._records[0][0]
+
+    def last(self) -> tuple:
+        """
+        Return the (key, record) pair with the largest key, or None if the index is empty
+        """
+        if not self._keys:
+            return None
+        return self._keys[-1][-1], self._records[-1][-1]
+
+    def _split(self, block_index: int) -> None:
+        """
+        Splits a block that grew too long into two halves.
+        """
+
+        keys, records = self._keys[block_index], self._records[block_index]
+        half = len(keys) // 2
+
+        self._keys[block_index:block_index + 1] = [keys[:half], keys[half:]]
+        self._records[block_index:block_index + 1] = [records[:half], records[half:]]
+        self._maxes[block_index:block_index + 1] = [keys[half - 1], keys[-1]]
+
+    def _merge(self, block_index: int) -> None:
+        """
+        Merges a block that shrank too far into the block after it (or before it, for the last block).
+        """
+
+        if block_index == len(self._keys) - 1:
+            block_index -= 1
+
+        self._keys[block_index] += self._keys.pop(block_index + 1)
+        self._records[block_index] += self._records.pop(block_index + 1)
+        del self._maxes[block_index]
+
+        if len(self._keys[block_index]) > 2 * self.LOAD:
+            self._split(block_index)
+
+
+class OrderedHashMap(MutableMapping):
+    """
+    HashMap with a sorted index of its keys, on top of hash_map_sc.HashMap or hash_map_oa.HashMap.
+    get, put, contains_key and remove use the hash map; new and removed keys also update the index.
+    range, prefix, min and max answer ordered queries from the index. Iteration runs in key order, and
+    adding or removing a key during iteration raises RuntimeError. Keys must be orderable with each other.
+    """
+
+    def __init__(self, hash_map=None) -> None:
+        """
+        Initialize a new empty ordered map stored in hash_map, an empty hash_map_sc.HashMap or
+        hash_map_oa.HashMap (a separate chaining HashMap with hash_function_1 by default).
+        """
+        if hash_map is None:
+            hash_map = hash_map_sc.HashMap(11, hash_function_1)
+
+        if isinstance(hash_map, hash_map_sc.HashMap):
+            self._find = hash_map._get_node_from_key
+        elif isinstance(hash_map, hash_map_oa.HashMap):
+            self._find = hash_map._get_entry_from_key
+        else:
+            raise TypeError('OrderedHashMap stores entries in hash_map_sc.HashMap or hash_map_oa.HashMap')
+
+        if hash_map.get_size():
+            raise ValueError('OrderedHashMap needs an empty hash map')
+
+        self._map = hash_map
+        self._hash_key = hash_map._hash_key
+        self._put_record = hash_map._put_record
+        self._index = SortedKeyIndex()
+
+        # Bumped whenever keys are added or removed, so iterators can detect changes.
+        self._modcount = 0
+
+    def __str__(self) -> str:
+        """
+        Override string method to provide more readable output
+        """
+        out = ''
+        for key, value in self.items():
+            out += str(key) + ': ' + str(value) + '\n'
+        return out
+
+    def get_size(self) -> int:
+        """
+        Return size of map
+        """
+        return self._map.get_size()
+
+    # ------------------------------------------------------------------ #
+
+
+    def put(self, key: str, value: object) -> None:
+        """
+        :param key: String that maps to an integer index of the HashMap.
+        :param value: Object to be added to the mapped location.
+
+        Updates key-value pair in the hash map. If key is not in the hash map, adds new key-value pair
+        and inserts key into the index. If the index cannot order a new key with the others, the key is
+        taken back out of the hash map before the error is raised.
+        """
+
+        hash_value = self._hash_key(key)
+        size = self._map.get_size()
+        record = self._put_record(key, value, hash_value)
+
+        # Only a new key changes the size; updates leave the index alone.
+        if self._map.get_size() != size:
+            try:
+                self._index.add(key, record)
+            except Exception:
+                self._map._remove(key, hash_value)
+                raise
+
+            self._modcount += 1
+
+
+    def get(self, key: str, default: object = None) -> object:
+        """
+        :param key: String that maps to an integer index of the HashMap.
+        :param default: Object returned when key is not in the hash map.
+        :return: Object paired to key.
+
+        Returns the value associated with the given key through the hash map.
+        If the key is not in the hash map, the method returns default (None unless given).
+        """
+
+        record = self._find(key, self._hash_key(key))
+
+        if record is None:
+            return default
+
+        return record.value
+
+
+    def contains_key(self, key: str) -> bool:
+        """
+        :param key: String that maps to an integer index of the HashMap.
+        :return: True if key is in HashMap. False otherwise.
+        """
+
+        return self._find(key, self._hash_key(key)) is not None
+
+
+    def remove(self, key: str) -> None:
+        """
+        :param key: String that maps to an integer index of the HashMap.
+
+        Removes given key and its associated value from the hash map and the index.
+        If the key is not in the hash map, the method does nothing.
+        """
+
+        self._remove(key)
+
+
+    def clear(self) -> None:
+        """
+        Clears the contents of the hash map and the index without changing the table capacity.
+        """
+
+        self._map.clear()
+        self._index = SortedKeyIndex()
+        self._modcount += 1
+
+
+    def get_keys_and_values(self) -> DynamicArray:
+        """
+        :return: Dynamic array of key-value pairs.
+
+        Returns a dynamic array of every key-value pair, in key order.
+        """
+
+        return self.range()
+
+
+    def range(self, low: object = None, high: object = None) -> DynamicArray:
+        """
+        :param low: Smallest key to include, or None for no lower bound.
+        :param high: Key to stop before, or None for no upper bound.
+        :return: Dynamic array of (key, value) pairs with low <= key < high, in key order.
+        """
+
+        index = self._index
+        start = index.position(low) if low is not None else (0, 0)
+        pairs_da = DynamicArray()
+
+        for key, record in index.walk(*start):
+            if high is not None and not key < high:
+                break
+            pairs_da.append((key, record.value))
+
+        return pairs_da
+
+
+    def prefix(self, prefix: str) -> DynamicArray:
+        """
+        :param prefix: String (or bytes) that keys must start with.
+        :return: Dynamic array of (key, value) pairs whose key starts with prefix, in key order.
+        """
+
+        pairs_da = DynamicArray()
+
+        # Keys with the prefix sort together, starting at the prefix itself.
+        for key, record in self._index.walk(*self._index.position(prefix)):
+            if not key.startswith(prefix):
+                break
+            pairs_da.append((key, record.value))
+
+        return pairs_da
+
+
+    def min(self) -> tuple:
+        """
+        :return: The (key, value) pair with the smallest key, or None if the map is empty.
+        """
+
+        first = self._index.first()
+        return (first[0], first[1].value) if first is not None else None
+
+
+    def max(self) -> tuple:
+        """
+        :return: The (key, value) pair with the largest key, or None if the map is empty.
+        """
+
+        last = self._index.last()
+        return (last[0], last[1].value) if last is not None else None
+
+
+    # ---------------------- Mapping protocol ---------------------- #
+
+    def __getitem__(self, key: str) -> object:
+        """
+        Returns the value paired to key using [] syntax. Raises KeyError if key is not in the hash map.
+        """
+
+        record = self._find(key, self._hash_key(key))
+
+        if record is None:
+            raise KeyError(key)
+
+        return record.value
+
+
+    def __setitem__(self, key: str, value: object) -> None:
+        """
+        Adds or updates key-value pair using [] syntax.
+        """
+
+        self.put(key, value)
+
+
+    def __delitem__(self, key: str) -> None:
+        """
+        Removes key using del syntax. Raises KeyError if key is not in the hash map.
+        """
+
+        if not self._remove(key):
+            raise KeyError(key)
+
+
+    def __contains__(self, key: str) -> bool:
+        """
+        Returns True if key is in the hash map, for use with the in operator.
+        """
+
+        return self._find(key, self._hash_key(key)) is not None
+
+
+    def __len__(self) -> int:
+        """
+        Returns the number of key-value pairs in the hash map.
+        """
+
+        return self._map.get_size()
+
+
+    def __iter__(self):
+        """
+        Returns an iterator over the keys in key order.
+        """
+
+        return self._iterator(ITER_KEYS)
+
+
+    def keys(self) -> HashMapKeysView:
+        """
+        Returns a live view of the keys in key order.
+        """
+
+        return HashMapKeysView(self)
+
+
+    def values(self) -> HashMapValuesView:
+        """
+        Returns a live view of the values in key order.
+        """
+
+        return HashMapValuesView(self)
+
+
+    def items(self) -> HashMapItemsView:
+        """
+        Returns a live view of the (key, value) pairs in key order.
+        """
+
+        return HashMapItemsView(self)
+
+
+    def _iterator(self, kind: int):
+        """
+        :param kind: ITER_KEYS, ITER_VALUES or ITER_ITEMS.
+        :return: New iterator over the index in key order.
+        """
+
+        modcount = self._modcount
+
+        for key, record in self._index.walk(0, 0):
+            if kind == ITER_KEYS:
+                yield key
+            elif kind == ITER_VALUES:
+                yield record.value
+            else:
+                yield key, record.value
+
+            if self._modcount != modcount:
+                raise RuntimeError("HashMap changed during iteration")
+
+
+    def _remove(self, key: str) -> bool:
+        """
+        :param key: String that maps to an integer index of the HashMap.
+        :return: True if key was removed. False if key was not in the hash map.
+
+        Removes key from the index first, then from the hash map, whose open addressing variant may
+        reuse the entry for another key once it is a tombstone.
+        """
+
+        hash_value = self._hash_key(key)
+
+        if self._find(key, hash_value) is None:
+            return False
+
+        self._index.discard(key)
+        self._map._remove(key, hash_value)
+        self._modcount += 1
+        return True
+
+
+# ------------------- BASIC TESTING ---------------------------------------- #
+
+
+if __name__ == "__main__":
+
+    print("\nOrderedHashMap - range example 1")
+    print("--------------------------------")
+    m = OrderedHashMap()
+    for i in range(0, 100, 7):
+        m.put('key' + str(i).zfill(3), i)
+    print(m.range('key020', 'key050'))
+    print(m.min(), m.max(), m.get_size())
+    m.remove('key000')
+    m.put('key098', 'updated')
+    print(m.min(), m.max(), m.get('key049'))
+
+    print("\nOrderedHashMap - prefix example 1")
+    print("---------------------------------")
+    m = OrderedHashMap(hash_map_oa.HashMap(11, hash_function_2))
+    for word in ('apple', 'apricot', 'banana', 'apex', 'berry', 'ape', 'cherry'):
+        m[word] = len(word)
+    print(m.prefix('ap'))
+    print(m.prefix('b'), m.prefix('z'))
+    print(list(m))
+
+    print("\nOrderedHashMap - large example 1")
+    print("--------------------------------")
+    m = OrderedHashMap(hash_map_sc.HashMap(11, hash_function_2))
+    for i in range(5000):
+        m.put('str' + str(i), i)
+    for i in range(0, 5000, 2):
+        m.remove('str' + str(i))
+    result = m.range('str1', 'str2')
+    print(result.length(), result[0], m.prefix('str499').length(), list(m) == sorted(m))
@@ -0,0 +1,447 @@
+# Description: Implementation of a HashMap using Robin Hood hashing. Collisions are resolved with linear probing,
+#              where an inserted entry takes the slot of any entry that is closer to its own home slot. This keeps
+#              probe lengths short and even at load factors of 0.85 and above. Deletions shift the following
+#              entries back one slot, so no tombstones are needed.
+
+
+from collections.abc import MutableMapping
+
+from base_include import (DynamicArray, HashEntry, resolve_hash_function, next_prime_capacity,
+                        hash_function_1, hash_function_2)
+
+class HashMap(MutableMapping):
+    def __init__(self, capacity: int, function, seed: int = None, max_load: float = 0.9) -> None:
+        """
+        Initialize new HashMap that uses
+        Robin Hood linear probing for collision resolution
+        function may be a hash function or the name of a registered one, built with seed.
+        The table doubles before adding a key once the load factor reaches max_load, which must be
+        greater than 0 and at most 1.
+        """
+        if not 0 < max_load <= 1:
+            raise ValueError('max_load must be greater than 0 and at most 1')
+
+        self._buckets = DynamicArray()
+
+        # capacity must be a prime number
+        self._capacity = next_prime_capacity(capacity)
+        for _ in range(self._capacity):
+            self._buckets.append(None)
+
+        self._hash_function = resolve_hash_function(function, seed)
+        self._size = 0
+        self._max_load = max_load
+        self._modcount = 0
+
+    def __str__(self) -> str:
+        """
+        Override string method to provide more readable output
+        """
+        out = ''
+        for i in range(self._buckets.length()):
+            out += str(i) + ': ' + str(self._buckets[i]) + '\n'
+        return out
+
+    def get_size(self) -> int:
+        """
+        Return size of map
+        """
+        return self._size
+
+    def get_capacity(self) -> int:
+        """
+        Return capacity of map
+        """
+        return self._capacity
+
+    # ------------------------------------------------------------------ #
+
+
+    def put(self, key: str, value: object) -> None:
+        """
+        :param key: String that maps to an integer index of the HashMap.
+        :param value: Object to be added to the mapped location.
+
+        Updates key-value pair in the hash map. If key is not in the hash map, adds new key-value pair.
+        Adding a key doubles HashMap table capacity when load factor is greater or equal to max_load.
+        """
+
+        hash_value = self._hash_function(key)
+        capacity = self._capacity
+        index = hash_value % capacity
+
+        # Walk the probe sequence until the key, an empty slot or a richer entry is found.
+        for distance in range(capacity):
+            hash_entry = self._buckets[index]
+
+            if hash_entry is None:
+                break
+
+            if hash_entry.hash == hash_value and hash_entry.key == key:
+
+                # Replace existing value.
+                hash_entry.value = value
+                return
+
+            # An entry closer to its home slot means the key is not in the map.
+            if (index - hash_entry.hash) % capacity < distance:
+                break
+
+            index = (index + 1) % capacity
+
+        # Check if resize is needed. The key is new, so it is placed again from its home slot.
+        if self.table_load() >= self._max_load:
+            self.resize_table(self._capacity * 2)
+            index = hash_value % self._capacity
+
+        self._place_entry(HashEntry(key, value, hash_value), index)
+        self._size += 1
+        self._modcount += 1
+
+
+    def resize_table(self, new_capacity: int) -> None:
+        """
+        :param new_capacity: Integer value of the HashMap table's new capacity.
+
+        Changes the underlying table's capacity. Entries are moved to a new table using their cached hashes.
+        new_capacity is rounded up to the next prime, and keeps doubling until the table holds every entry
+        below max_load.
+        """
+
+        # If new_capacity is less current elements in hash map, method does nothing.
+        if new_capacity < self._size:
+            return
+
+        new_capacity = next_prime_capacity(new_capacity)
+        while self._size / new_capacity >= self._max_load:
+            new_capacity = next_prime_capacity(new_capacity * 2)
+
+        # Store old information and create new HashMap table.
+        old_table, old_capacity = self._buckets, self._capacity
+        self._buckets = DynamicArray()
+
+        for num in range(new_capacity):
+            self._buckets.append(None)
+
+        self._capacity = new_capacity
+        self._modcount += 1
+
+        # Keys are already unique, so each entry only has to find its Robin Hood position.
+        for index in range(old_capacity):
+            hash_entry = old_table[index]
+
+            if hash_entry is not None:
+                self._place_entry(hash_entry, hash_entry.hash % new_capacity)
+
+
+    def table_load(self) -> float:
+        """
+        Returns the load factor of current HashMap table.
+        Load Factor = objects stored / number of buckets
+        """
+
+        return self._size / self._capacity
+
+
+    def empty_buckets(self) -> int:
+        """
+        :return: Integer of empty buckets.
+
+        Returns the number of empty buckets in the hash table.
+        """
+
+        return self._capacity - self._size
+
+
+    def get(self, key: str, default: object = None) -> object:
+        """
+        :param key: String that maps to an integer index of the HashMap.
+        :param default: Object returned when key is not in the hash map.
+        :return: Object paired to key.
+
+        Returns the value associated with the given key.
+        If the key is not in the hash map, the method returns default (None unless given).
+        """
+
+        index = self._get_index_from_key(key)
+
+        if index is not None:
+            return self._buckets[index].value
+
+        return default
+
+
+    def contains_key(self, key: str) -> bool:
+        """
+        :param key: String that maps to an integer index of the HashMap.
+        :return: True if key is in HashMap. False otherwise.
+
+        Returns True if the given key is in the hash map, otherwise it returns False.
+        """
+
+        return self._get_index_from_key(key) is not None
+
+
+    def remove(self, key: str) -> None:
+        """
+        :param key: String that maps to an integer index of the HashMap.
+
+        Removes given key and its associated value from the hash map.
+        If the key is not in the hash map, the method does nothing.
+        Following entries that are away from their home slot are shifted back, so no tombstone is left.
+        """
+
+        index = self._get_index_from_key(key)
+
+        if index is not None:
+            self._remove_at(index)
+
+
+    def _remove_at(self, index: int) -> None:
+        """
+        :param index: Slot of the entry to remove.
+
+        Removes the entry at index with backward-shift deletion.
+        """
+
+        capacity = self._capacity
+        next_index = (index + 1) % capacity
+        hash_entry = self._buckets[next_index]
+
+        # Backward shift until an empty slot or an entry already in its home slot.
+        while hash_entry is not None and hash_entry.hash % capacity != next_index:
+            self._buckets[index] = hash_entry
+            index, next_index = next_index, (next_index + 1) % capacity
+            hash_entry = self._buckets[next_index]
+
+        self._buckets[index] = None
+        self._size -= 1
+        self._modcount += 1
+
+
+    def get_keys_and_values(self) -> DynamicArray:
+        """
+        :return: Dynamic array of key-value pairs.
+
+        Returns a dynamic array where each index contains a tuple of a key-value pair from the hash map.
+        """
+
+        contents_da = DynamicArray()
+
+        for index in range(self._capacity):
+            hash_entry = self._buckets[index]
+
+            if hash_entry is not None:
+                contents_da.append((hash_entry.key, hash_entry.value))
+
+        return contents_da
+
+
+    def clear(self) -> None:
+        """
+        Clears the contents of the hash map without changing the underlying table capacity.
+        """
+
+        self._buckets = DynamicArray()
+        self._size = 0
+        self._modcount += 1
+
+        for index in range(self._capacity):
+            self._buckets.append(None)
+
+
+    # ---------------------- Mapping protocol ---------------------- #
+
+    def __getitem__(self, key: str) -> object:
+        """
+        Returns the value paired to key using [] syntax. Raises KeyError if key is not in the hash map.
+        """
+
+        index = self._get_index_from_key(key)
+
+        if index is None:
+            raise KeyError(key)
+
+        return self._buckets[index].value
+
+
+    def __setitem__(self, key: str, value: object) -> None:
+        """
+        Adds or updates key-value pair using [] syntax.
+        """
+
+        self.put(key, value)
+
+
+    def __delitem__(self, key: str) -> None:
+        """
+        Removes key using del syntax. Raises KeyError if key is not in the hash map.
+        """
+
+        index = self._get_index_from_key(key)
+
+        if index is None:
+            raise KeyError(key)
+
+        self._remove_at(index)
+
+
+    def __contains__(self, key: str) -> bool:
+        """
+        Returns True if key is in the hash map, for use with the in operator.
+        """
+
+        return self._get_index_from_key(key) is not None
+
+
+    def __len__(self) -> int:
+        """
+        Returns the number of key-value pairs in the hash map.
+        """
+
+        return self._size
+
+
+    def __iter__(self) -> "HashMapIterator":
+        """
+        Returns an iterator over the keys in the hash map.
+        """
+
+        return HashMapIterator(self)
+
+
+    def _place_entry(self, hash_entry: HashEntry, index: int) -> None:
+        """
+        :param hash_entry: HashEntry whose key is not in the table.
+        :param index: Slot to start from, on the entry's probe sequence.
+
+        Inserts an entry by Robin Hood rules: whenever the resident entry is closer to its home slot
+        than the entry being placed, they swap and the displaced entry continues down the table.
+        """
+
+        capacity = self._capacity
+        distance = (index - hash_entry.hash) % capacity
+
+        while True:
+            resident = self._buckets[index]
+
+            if resident is None:
+                self._buckets[index] = hash_entry
+                return
+
+            resident_distance = (index - resident.hash) % capacity
+
+            if resident_distance < distance:
+                self._buckets[index] = hash_entry
+                hash_entry, distance = resident, resident_distance
+
+            index = (index + 1) % capacity
+            distance += 1
+
+
+    def _get_index_from_key(self, key: str) -> int:
+        """
+        :param key: String that maps to an integer index of the HashMap.
+        :return: Integer index associated with key.
+
+        Returns the slot index that matches the key. The probe stops at an empty slot, or at an entry
+        closer to its home slot than the key would be, since the key would have displaced it.
+        """
+
+        hash_value = self._hash_function(key)
+        capacity = self._capacity
+        index = hash_value % capacity
+
+        for distance in range(capacity):
+            hash_entry = self._buckets[index]
+
+            if hash_entry is None or (index - hash_entry.hash) % capacity < distance:
+                return None
+
+            if hash_entry.hash == hash_value and hash_entry.key == key:
+                return index
+
+            index = (index + 1) % capacity
+
+        return None
+
+
+class HashMapIterator:
+    """
+    Separate iterator class for HashMap
+    Keeps its own cursor, so any number of iterators can walk the same map at once. Adding or removing
+    a key, or resizing the table, while an iterator is in use makes its next step raise RuntimeError.
+    """
+
+    def __init__(self, hash_map: HashMap) -> None:
+        """Initialize the iterator at the first slot."""
+        self._map = hash_map
+        self._buckets = hash_map._buckets
+        self._capacity = hash_map._capacity
+        self._modcount = hash_map._modcount
+        self._index = 0
+
+    def __iter__(self) -> "HashMapIterator":
+        """Return the iterator."""
+        return self
+
+    def __next__(self) -> object:
+        """Obtain the key of the next entry and advance iterator."""
+
+        if self._map._modcount != self._modcount:
+            raise RuntimeError("HashMap changed during iteration")
+
+        buckets, index = self._buckets, self._index
+
+        # Skip empty slots.
+        while index < self._capacity:
+            hash_entry = buckets[index]
+            index += 1
+
+            if hash_entry is not None:
+                self._index = index
+                return hash_entry.key
+
+        self._index = index
+        raise StopIteration
+
+
+# ------------------- BASIC TESTING ---------------------------------------- #
+
+
+if __name__ == "__main__":
+
+    print("\nRobin Hood - put example 1")
+    print("--------------------------")
+    m = HashMap(53, hash_function_1)
+    for i in range(150):
+        m.put('str' + str(i), i * 100)
+        if i % 25 == 24:
+            print(m.empty_buckets(), round(m.table_load(), 2), m.get_size(), m.get_capacity())
+
+    print("\nRobin Hood - contains_key example 1")
+    print("-----------------------------------")
+    m = HashMap(79, hash_function_2)
+    keys = [i for i in range(1, 1000, 20)]
+    for key in keys:
+        m.put(str(key), key * 42)
+    print(m.get_size(), m.get_capacity())
+    result = True
+    for key in keys:
+        # all inserted keys must be present
+        result &= m.contains_key(str(key))
+        # NOT inserted keys must be absent
+        result &= not m.contains_key(str(key + 1))
+    print(result)
+
+    print("\nRobin Hood - remove example 1")
+    print("-----------------------------")
+    m = HashMap(11, hash_function_2)
+    for i in range(1, 10):
+        m.put(str(i), str(i * 10))
+    m.remove('3')
+    m.remove('7')
+    m.remove('42')
+    print(m.get_size(), m.get('3'), m.get('4'), m.get_keys_and_values())
+    for key in m:
+        print('K:', key, 'V:', m[key])
@@ -1,33 +1,72 @@
 # Name: Kevin Lin
 #
 # Last Edit Date: 6/5/2025
-# Description: Implementation of an optimized HashMap using linked list chaining. The hash table is stored in
-#              a dynamic array and collisions are resolved using a singly linked list. The average case
-#              performance of user end operations are maintained at an O(1) time complexity.
-
-
-from base_include import (DynamicArray, LinkedList,
+# Description: Implementation of an optimized HashMap using chaining. The hash table is stored in a dynamic
+#              array of compact buckets: an empty bucket is None, a bucket with one entry holds its node
+#              inline, and longer chains spill into a small list of nodes with cached hashes. Chains that
+#              reach TREEIFY_THRESHOLD nodes switch to a sorted bucket searched by binary search, so a poor
+#              hash function costs O(log n) per lookup instead of O(n). The average case performance of
+#              user end operations are maintained at an O(1) time complexity.
+
+
+from collections.abc import MutableMapping
+
+from base_include import (DynamicArray, SLNode, bucket_find, bucket_add, bucket_discard, bucket_nodes,
+                        to_list, hash_many,
+                        hash_many_parallel, resolve_hash_function, mix_hash, mixed_hash_function,
+                        next_prime_capacity,
+                        HashMapKeysView, HashMapValuesView, HashMapItemsView,
+                        ITER_KEYS, ITER_VALUES,
+                        dump_snapshot, load_snapshot, SNAPSHOT_LAYOUT, SNAPSHOT_POWER_OF_TWO,
                         hash_function_1, hash_function_2)
 
-class HashMap:
+class HashMap(MutableMapping):
+    # Number of old-table buckets moved to the new table on each put/get/remove
+    # while an incremental resize is in progress.
+    MIGRATION_STEP = 8
+
     def __init__(self,
                  capacity: int = 11,
-                 function: callable = hash_function_1) -> None:
+                 function: callable = hash_function_1,
+                 incremental: bool = False,
+                 seed: int = None,
+                 power_of_two: bool = False) -> None:
         """
         Initialize new HashMap that uses
         separate chaining for collision resolution
-        DO NOT CHANGE THIS METHOD IN ANY WAY
+        function may be a hash function or the name of a registered one, built with seed.
+        If incremental is True, growing the table rehashes a few buckets per operation
+        instead of the whole table at once.
+        If power_of_two is True, capacities are powers of two and buckets are picked with a bitmask
+        on mixed hashes instead of a modulo by a prime.
+        DO NOT CHANGE THE capacity AND function PARAMETERS IN ANY WAY
         """
-        self._buckets = DynamicArray()
+        # capacity must be a prime number, or a power of two in power-of-two mode
+        self._mask = 0 if power_of_two else None
+        self._capacity = self._next_capacity(capacity)
+
+        # Every bucket starts out empty (None).
+        self._buckets = DynamicArray([None] * self._capacity)
 
-        # capacity must be a prime number
-        self._capacity = self._next_prime(capacity)
-        for _ in range(self._capacity):
-            self._buckets.append(LinkedList())
+        if power_of_two:
+            self._mask = self._capacity - 1
 
-        self._hash_function = function
+        self._hash_function = resolve_hash_function(function, seed)
         self._size = 0
 
+        # Hash applied to keys; power-of-two mode mixes the hash so its low bits are well spread.
+        self._hash_key = mixed_hash_function(self._hash_function) if power_of_two else self._hash_function
+
+        # Incremental resize state. _old_buckets is None unless a migration is in progress.
+        self._incremental = incremental
+        self._old_buckets = None
+        self._old_capacity = 0
+        self._old_mask = None
+        self._migrate_index = 0
+
+        # Bumped whenever keys are added or removed or nodes move, so iterators can detect changes.
+        self._modcount = 0
+
     def __str__(self) -> str:
         """
         Override string method to provide more readable output
@@ -38,38 +77,15 @@ class HashMap:
             out += str(i) + ': ' + str(self._buckets[i]) + '\n'
         return out
 
-    def _next_prime(self, capacity: int) -> int:
+    def _next_capacity(self, capacity: int) -> int:
         """
-        Increment from given number and the find the closest prime number
-        DO NOT CHANGE THIS METHOD IN ANY WAY
+        Return the table capacity to use for the requested capacity: the next power of two in
+        power-of-two mode, otherwise the next prime.
         """
-        if capacity % 2 == 0:
-            capacity += 1
-
-        while not self._is_prime(capacity):
-            capacity += 2
-
-        return capacity
-
-    @staticmethod
-    def _is_prime(capacity: int) -> bool:
-        """
-        Determine if given integer is a prime number and return boolean
-        DO NOT CHANGE THIS METHOD IN ANY WAY
-        """
-        if capacity == 2 or capacity == 3:
-            return True
-
-        if capacity == 1 or capacity % 2 == 0:
-            return False
-
-        factor = 3
-        while factor ** 2 <= capacity:
-            if capacity % factor == 0:
-                return False
-            factor += 2
+        if self._mask is not None:
+            return 1 << max(capacity - 1, 1).bit_length()
 
-        return True
+        return next_prime_capacity(capacity)
 
     def get_size(self) -> int:
         """
@@ -93,65 +109,101 @@ class HashMap:
         :param value: Object to be added to the mapped location.
 
         Updates key-value pair in the hash map. If key is not in the hash map, adds new key-value pair.
-        Doubles HashMap table capacity when load factor is greater or equal to 1.
+        Doubles HashMap table capacity before adding a key when load factor is greater or equal to 1.
+        Updating an existing key never resizes the table.
         """
 
-        # Check if resize is needed.
-        if self.table_load() >= 1:
-            self.resize_table(self._capacity * 2)
+        self._put(key, value, self._hash_key(key))
 
-        # Find HashMap index.
-        hash_value = self._hash_function(key)
-        index = hash_value % self._capacity
 
-        # Check if a key-value pair already exist at HashMap index.
-        linked_list = self._buckets[index]
-        node = linked_list.contains(key)
+    def _put(self, key: str, value: object, hash_value: int) -> SLNode:
+        """
+        :param key: String that maps to an integer index of the HashMap.
+        :param value: Object to be added to the mapped location.
+        :param hash_value: Full hash of key, computed once by the caller.
+        :return: SLNode holding key.
+
+        Performs put using an already computed hash.
+        """
+
+        # Check if a key-value pair already exist, in either table during an incremental resize.
+        node = self._get_node_from_key(key, hash_value)
 
         if node:
             # Replace existing value.
             node.value = value
+            return node
 
+        # Check if resize is needed.
+        if self.table_load() >= 1:
+            self._grow_table()
+
+        # Find HashMap index.
+        if self._mask is not None:
+            index = hash_value & self._mask
         else:
-            # Add new key-value pair and update self._size.
-            linked_list.insert(key, value)
-            self._size += 1
+            index = hash_value % self._capacity
+
+        # Add new key-value pair and update self._size.
+        node = SLNode(key, value, None, hash_value)
+        self._buckets[index] = bucket_add(self._buckets[index], node)
+        self._size += 1
+        self._modcount += 1
+
+        return node
+
+
+    def _put_record(self, key: str, value: object, hash_value: int) -> SLNode:
+        """
+        :param key: String that maps to an integer index of the HashMap.
+        :param value: Object to be added to the mapped location.
+        :param hash_value: Full hash of key, computed once by the caller.
+        :return: SLNode holding key.
+
+        Performs put and returns the node it wrote, so wrapping maps can update their per-record
+        fields without a second lookup. Nodes keep their identity across resizes.
+        """
+
+        return self._put(key, value, hash_value)
 
 
     def resize_table(self, new_capacity: int) -> None:
         """
         :param new_capacity: Integer value of the HashMap table's new capacity.
 
-        Changes the underlying table's capacity. Existing key-values are rehashed and put into a new table.
-        If new_capacity is not a prime number, it will be set to the next highest prime number.
+        Changes the underlying table's capacity. Existing nodes are moved to a new table using their
+        cached hashes.
+        new_capacity is rounded up to the next prime (the next power of two in power-of-two mode).
+        The capacity keeps doubling until the load factor is no greater than 1.
         """
 
         # If new_capacity is less than one, method does nothing.
         if new_capacity < 1:
             return
 
-        # Ensure new_capacity is a prime number.
-        if not self._is_prime(new_capacity):
-            new_capacity = self._next_prime(new_capacity)
+        # An explicit resize completes any incremental resize first.
+        self._finish_migration()
+
+        # Ensure new_capacity is a prime number (or a power of two).
+        new_capacity = self._next_capacity(new_capacity)
+
+        # Pre-size the table so the rebuild never has to grow again.
+        while new_capacity < self._size:
+            new_capacity = self._next_capacity(new_capacity * 2)
 
         # Store old information and create new HashMap table.
         old_table, old_capacity = self._buckets, self._capacity
-        self._buckets = DynamicArray()
-
-        for num in range(new_capacity):
-            self._buckets.append(LinkedList())
+        self._buckets = DynamicArray([None] * new_capacity)
+        self._modcount += 1
 
-        # Update capacity and size.
+        # Update capacity.
         self._capacity = new_capacity
-        self._size = 0
+        if self._mask is not None:
+            self._mask = new_capacity - 1
 
         # Visit each HashMap index from the old table.
         for index in range(old_capacity):
-            linked_list = old_table[index]
-
-            # Rehash key-values to new table.
-            for node in linked_list:
-                self.put(node.key, node.value)
+            self._move_nodes(old_table[index])
 
 
     def table_load(self) -> float:
@@ -170,25 +222,28 @@ class HashMap:
         Returns the number of empty buckets in the hash table.
         """
 
+        self._finish_migration()
+
         empty_buckets = 0
 
         # Visit each HashMap index.
         for index in range(self._capacity):
 
             # Check if bucket is empty.
-            if self._buckets[index].length() == 0:
+            if self._buckets[index] is None:
                 empty_buckets += 1
 
         return empty_buckets
 
 
-    def get(self, key: str) -> object:
+    def get(self, key: str, default: object = None) -> object:
         """
         :param key: String that maps to an integer index of the HashMap.
+        :param default: Object returned when key is not in the hash map.
         :return: Object paired to key.
 
         Returns the value associated with the given key.
-        If the key is not in the hash map, the method returns None.
+        If the key is not in the hash map, the method returns default (None unless given).
         """
 
         node = self._get_node_from_key(key)
@@ -196,7 +251,7 @@ class HashMap:
         if node:
             return node.value
 
-        return None
+        return default
 
 
     def contains_key(self, key: str) -> bool:
@@ -222,16 +277,63 @@ class HashMap:
         If the key is not in the hash map, the method does nothing.
         """
 
-        # Find HashMap index.
-        hash_value = self._hash_function(key)
-        index = hash_value % self._capacity
+        self._remove(key, self._hash_key(key))
 
-        # Check for key in linked list nodes.
-        linked_list = self._buckets[index]
+
+    def _remove(self, key: str, hash_value: int) -> bool:
+        """
+        :param key: String that maps to an integer index of the HashMap.
+        :param hash_value: Full hash of key, computed once by the caller.
+        :return: True if key was removed. False if key was not in the hash map.
+
+        Performs remove using an already computed hash.
+        """
+
+        if self._old_buckets is not None:
+            self._migrate_buckets()
+
+        # Find HashMap index.
+        if self._mask is not None:
+            index = hash_value & self._mask
+        else:
+            index = hash_value % self._capacity
 
         # Remove node with key. Update self._size.
-        if linked_list.remove(key):
+        if self._discard(self._buckets, index, key, hash_value):
             self._size -= 1
+            self._modcount += 1
+            return True
+
+        # Check the old table during an incremental resize.
+        if self._old_buckets is not None:
+            old_index = self._old_index(hash_value)
+
+            if old_index >= self._migrate_index and self._discard(self._old_buckets, old_index, key, hash_value):
+                self._size -= 1
+                self._modcount += 1
+                return True
+
+        return False
+
+
+    def _discard(self, buckets: DynamicArray, index: int, key: str, hash_value: int) -> bool:
+        """
+        :param buckets: Table holding the bucket.
+        :param index: Integer index of the bucket.
+        :param key: String that maps to an integer index of the HashMap.
+        :param hash_value: Full hash of key.
+        :return: True if a node was removed from the bucket.
+
+        Removes the node with key from a bucket, storing the emptied or collapsed bucket back in the table.
+        """
+
+        bucket, node = bucket_discard(buckets[index], key, hash_value)
+
+        if node is None:
+            return False
+
+        buckets[index] = bucket
+        return True
 
 
     def get_keys_and_values(self) -> DynamicArray:
@@ -241,15 +343,16 @@ class HashMap:
         Returns a dynamic array where each index contains a tuple of a key-value pair from the hash map.
         """
 
+        self._finish_migration()
+
         # Create new dynamic array.
         contents_da = DynamicArray()
 
         # Visit each HashMap index.
         for index in range(self._capacity):
-            linked_list = self._buckets[index]
 
-            # Append key-value pairs from linked list nodes as tuples.
-            for node in linked_list:
+            # Append key-value pairs from the bucket's nodes as tuples.
+            for node in bucket_nodes(self._buckets[index]):
                 contents_da.append((node.key, node.value))
 
         return contents_da
@@ -260,30 +363,442 @@ class HashMap:
         Clears the contents of the hash map without changing the underlying table capacity.
         """
 
-        # Point self._buckets to an empty dynamic array. Reset self._size.
-        self._buckets = DynamicArray()
+        # Point self._buckets to a table of empty buckets. Reset self._size.
+        self._buckets = DynamicArray([None] * self._capacity)
         self._size = 0
+        self._modcount += 1
 
-        # Add a linked list to each index, based on self._capacity.
-        for index in range(self._capacity):
-            self._buckets.append(LinkedList())
+        # Drop any old table left over from an incremental resize.
+        self._old_buckets = None
+
+
+    def put_many(self, pairs, workers: int = None) -> None:
+        """
+        :param pairs: DynamicArray or iterable of (key, value) tuples.
+        :param workers: Number of processes to hash the keys in. By default they are hashed in this process.
+
+        Puts every key-value pair in order. All keys are hashed up front and the table is resized
+        at most once, to fit the current size plus the number of pairs.
+        With workers, large batches are hashed in a process pool, one range of keys per worker, and the
+        pairs are then placed in a single pass.
+        """
+
+        pairs = to_list(pairs)
+        hashes = self._hash_many([pair[0] for pair in pairs], workers)
+
+        # Pre-size the table so the load factor stays below 1 for the whole batch.
+        if self._size + len(pairs) > self._capacity:
+            self.resize_table(self._size + len(pairs))
+
+        put = self._put
+        for (key, value), hash_value in zip(pairs, hashes):
+            put(key, value, hash_value)
+
+
+    def get_many(self, keys) -> DynamicArray:
+        """
+        :param keys: DynamicArray or iterable of keys.
+        :return: Dynamic array of values in the same order as keys.
+
+        Returns the value for each key, or None for keys that are not in the hash map.
+        """
+
+        keys = to_list(keys)
+        get_node = self._get_node_from_key
+        values_da = DynamicArray()
+
+        for key, hash_value in zip(keys, self._hash_many(keys)):
+            node = get_node(key, hash_value)
+            values_da.append(node.value if node else None)
+
+        return values_da
+
+
+    def contains_many(self, keys) -> DynamicArray:
+        """
+        :param keys: DynamicArray or iterable of keys.
+        :return: Dynamic array of booleans in the same order as keys.
+
+        Returns whether each key is in the hash map.
+        """
+
+        keys = to_list(keys)
+        get_node = self._get_node_from_key
+        result_da = DynamicArray()
+
+        for key, hash_value in zip(keys, self._hash_many(keys)):
+            result_da.append(get_node(key, hash_value) is not None)
+
+        return result_da
+
+
+    def remove_many(self, keys) -> None:
+        """
+        :param keys: DynamicArray or iterable of keys.
+
+        Removes every key in keys from the hash map. Keys that are not in the hash map are ignored.
+        """
+
+        keys = to_list(keys)
+        remove = self._remove
+
+        for key, hash_value in zip(keys, self._hash_many(keys)):
+            remove(key, hash_value)
+
+
+    # ---------------------- Snapshots ---------------------- #
+
+    def dump(self, fileobj, layout: bool = False) -> None:
+        """
+        :param fileobj: Binary file object opened for writing.
+        :param layout: If True, also save each node's bucket index and cached hash.
+
+        Writes a binary snapshot of the hash map: a header with the capacity, size and hash function,
+        then length-prefixed key and value records. A layout snapshot loads without rehashing.
+        """
+
+        self._finish_migration()
+
+        flags = SNAPSHOT_LAYOUT if layout else 0
+        if self._mask is not None:
+            flags |= SNAPSHOT_POWER_OF_TWO
+
+        def slots():
+            for index in range(self._capacity):
+                for node in bucket_nodes(self._buckets[index]):
+                    yield index, node.hash, node.key, node.value, False
+
+        dump_snapshot(fileobj, self._hash_function, flags, self._capacity, self._size, 0, self._size, slots())
+
+
+    @classmethod
+    def load(cls, fileobj, function: callable = None, incremental: bool = False) -> "HashMap":
+        """
+        :param fileobj: Binary file object holding a snapshot written by dump.
+        :param function: Hash function to use. Defaults to the registered one saved in the snapshot.
+        :param incremental: Whether the loaded map resizes incrementally.
+        :return: New HashMap with the snapshot's contents and capacity.
+
+        Reads a snapshot. A layout snapshot links nodes straight into their saved buckets with their saved
+        hashes, so it must be loaded with the hash function it was written with.
+        """
+
+        function, flags, capacity, size, max_probe, slots = load_snapshot(fileobj, function)
+        hash_map = cls(capacity, function, incremental, power_of_two=bool(flags & SNAPSHOT_POWER_OF_TWO))
+
+        if not flags & SNAPSHOT_LAYOUT:
+            hash_map.put_many((key, value) for index, hash_value, key, value, tombstone in slots)
+            return hash_map
+
+        if hash_map._capacity != capacity:
+            raise ValueError('snapshot capacity is not a valid table capacity: ' + str(capacity))
+
+        buckets = hash_map._buckets
+        for index, hash_value, key, value, tombstone in slots:
+            buckets[index] = bucket_add(buckets[index], SLNode(key, value, None, hash_value))
+
+        hash_map._size = size
+        return hash_map
+
+
+    # ---------------------- Mapping protocol ---------------------- #
+
+    def __getitem__(self, key: str) -> object:
+        """
+        Returns the value paired to key using [] syntax. Raises KeyError if key is not in the hash map.
+        """
+
+        node = self._get_node_from_key(key)
+
+        if node is None:
+            raise KeyError(key)
+
+        return node.value
+
+
+    def __setitem__(self, key: str, value: object) -> None:
+        """
+        Adds or updates key-value pair using [] syntax.
+        """
+
+        self._put(key, value, self._hash_key(key))
+
+
+    def __delitem__(self, key: str) -> None:
+        """
+        Removes key using del syntax. Raises KeyError if key is not in the hash map.
+        """
+
+        if not self._remove(key, self._hash_key(key)):
+            raise KeyError(key)
+
+
+    def __contains__(self, key: str) -> bool:
+        """
+        Returns True if key is in the hash map, for use with the in operator.
+        """
+
+        return self._get_node_from_key(key) is not None
+
+
+    def __len__(self) -> int:
+        """
+        Returns the number of key-value pairs in the hash map.
+        """
+
+        return self._size
 
 
-    def _get_node_from_key(self, key: str) -> object:
+    def __iter__(self) -> "HashMapIterator":
+        """
+        Returns a new iterator over the keys in the hash map.
+        """
+
+        return HashMapIterator(self, ITER_KEYS)
+
+
+    def keys(self) -> HashMapKeysView:
+        """
+        Returns a live view of the keys that walks the buckets without copying them.
+        """
+
+        return HashMapKeysView(self)
+
+
+    def values(self) -> HashMapValuesView:
+        """
+        Returns a live view of the values that walks the buckets without copying them.
+        """
+
+        return HashMapValuesView(self)
+
+
+    def items(self) -> HashMapItemsView:
+        """
+        Returns a live view of the (key, value) pairs that walks the buckets without copying them.
+        """
+
+        return HashMapItemsView(self)
+
+
+    def _iterator(self, kind: int) -> "HashMapIterator":
+        """
+        :param kind: ITER_KEYS, ITER_VALUES or ITER_ITEMS.
+        :return: New iterator over the hash map.
+
+        Creates the iterator used by the map's views.
+        """
+
+        return HashMapIterator(self, kind)
+
+
+    def _hash_many(self, keys: list, workers: int = None) -> list:
+        """
+        :param keys: List of keys.
+        :param workers: Number of processes to hash the keys in, or None to hash them in this process.
+        :return: List of full hashes in the same order as keys.
+
+        Hashes a batch of keys with the map's hash function, vectorized when NumPy is available.
+        """
+
+        if workers is not None:
+            return hash_many_parallel(self._hash_function, keys, workers, self._mask is not None)
+
+        hashes = hash_many(self._hash_function, keys)
+
+        if self._mask is not None:
+            return list(map(mix_hash, hashes))
+
+        return hashes
+
+
+    def _get_node_from_key(self, key: str, hash_value: int = None) -> object:
         """
         :param key: String that maps to an integer index of the HashMap.
+        :param hash_value: Full hash of key. Computed from key if not given.
         :return: SLNode associated with key.
 
         Returns the node that matches the key. If key is not found, returns None.
         """
 
+        if self._old_buckets is not None:
+            self._migrate_buckets()
+
         # Find HashMap index.
-        hash_value = self._hash_function(key)
-        index = hash_value % self._capacity
+        if hash_value is None:
+            hash_value = self._hash_key(key)
+
+        if self._mask is not None:
+            index = hash_value & self._mask
+        else:
+            index = hash_value % self._capacity
+
+        # Check for key in the bucket's nodes.
+        node = bucket_find(self._buckets[index], key, hash_value)
 
-        # Check for key in linked list nodes.
-        linked_list = self._buckets[index]
-        return linked_list.contains(key)
+        if node is None and self._old_buckets is not None:
+            return self._get_old_node(key, hash_value)
+
+        return node
+
+
+    def _get_old_node(self, key: str, hash_value: int) -> object:
+        """
+        :param key: String that maps to an integer index of the HashMap.
+        :param hash_value: Hash of key.
+        :return: SLNode associated with key in the old table.
+
+        Looks up key in the part of the old table that has not been migrated yet.
+        """
+
+        old_index = self._old_index(hash_value)
+
+        if old_index < self._migrate_index:
+            return None
+
+        return bucket_find(self._old_buckets[old_index], key, hash_value)
+
+
+    def _grow_table(self) -> None:
+        """
+        Doubles the HashMap table capacity. In incremental mode, a new table is allocated and the
+        old buckets are moved over a few at a time by later operations.
+        """
+
+        if not self._incremental:
+            self.resize_table(self._capacity * 2)
+            return
+
+        # Only one migration runs at a time.
+        self._finish_migration()
+
+        # Keep the old table alive and start with an empty new table.
+        self._modcount += 1
+        self._old_buckets, self._old_capacity = self._buckets, self._capacity
+        self._old_mask = self._mask
+        self._migrate_index = 0
+
+        self._capacity = self._next_capacity(self._capacity * 2)
+        if self._mask is not None:
+            self._mask = self._capacity - 1
+        self._buckets = DynamicArray([None] * self._capacity)
+
+
+    def _migrate_buckets(self, count: int = None) -> None:
+        """
+        :param count: Number of old buckets to move. Defaults to MIGRATION_STEP.
+
+        Moves the next old buckets into the new table. Ends the migration once the old table is empty.
+        """
+
+        if count is None:
+            count = self.MIGRATION_STEP
+
+        stop = min(self._migrate_index + count, self._old_capacity)
+
+        for old_index in range(self._migrate_index, stop):
+
+            self._move_nodes(self._old_buckets[old_index])
+
+        self._migrate_index = stop
+
+        if stop == self._old_capacity:
+            self._old_buckets = None
+
+
+    def _move_nodes(self, bucket) -> None:
+        """
+        :param bucket: Bucket from an old table.
+
+        Moves every node of an old bucket into the current table using its cached hash.
+        Keys are already unique, so nodes are added without a duplicate check and self._size
+        is unchanged. The old bucket itself is left as it was.
+        """
+
+        buckets, capacity, mask = self._buckets, self._capacity, self._mask
+
+        for node in bucket_nodes(bucket):
+            index = node.hash & mask if mask is not None else node.hash % capacity
+            buckets[index] = bucket_add(buckets[index], node)
+
+
+    def _old_index(self, hash_value: int) -> int:
+        """
+        :param hash_value: Full hash of a key.
+        :return: Integer index of the key's bucket in the old table.
+        """
+
+        if self._old_mask is not None:
+            return hash_value & self._old_mask
+
+        return hash_value % self._old_capacity
+
+
+    def _finish_migration(self) -> None:
+        """
+        Moves every remaining old bucket into the new table.
+        """
+
+        if self._old_buckets is not None:
+            self._migrate_buckets(self._old_capacity)
+
+
+class HashMapIterator:
+    """
+    Separate iterator class for HashMap
+    Keeps its own cursor (a bucket index and a position within a longer bucket), so any number of
+    iterators can walk the same map at once. Nodes are read straight from the buckets. Adding or
+    removing a key, or resizing the table, while an iterator is in use makes its next step raise
+    RuntimeError.
+    """
+
+    def __init__(self, hash_map: HashMap, kind: int = ITER_KEYS) -> None:
+        """Initialize the iterator at the first bucket. Any incremental resize is finished first."""
+        hash_map._finish_migration()
+
+        self._map = hash_map
+        self._buckets = hash_map._buckets
+        self._capacity = hash_map._capacity
+        self._modcount = hash_map._modcount
+        self._kind = kind
+        self._index = 0
+        self._nodes = ()
+        self._position = 0
+
+    def __iter__(self) -> "HashMapIterator":
+        """Return the iterator."""
+        return self
+
+    def __next__(self) -> object:
+        """Obtain the key, value or pair of the next node and advance iterator."""
+
+        if self._map._modcount != self._modcount:
+            raise RuntimeError("HashMap changed during iteration")
+
+        # Continue through the current overflow array.
+        if self._position < len(self._nodes):
+            node = self._nodes[self._position]
+            self._position += 1
+        else:
+            node = None
+
+        # Move on to the next non-empty bucket.
+        while node is None:
+            if self._index >= self._capacity:
+                raise StopIteration
+
+            node = self._buckets[self._index]
+            self._index += 1
+
+            if node is not None and type(node) is not SLNode:
+                self._nodes, self._position = bucket_nodes(node), 1
+                node = self._nodes[0]
+
+        if self._kind == ITER_KEYS:
+            return node.key
+        if self._kind == ITER_VALUES:
+            return node.value
+        return node.key, node.value
 
 
 def find_mode(da: DynamicArray) -> tuple[DynamicArray, int]:
@@ -532,3 +1047,45 @@ if __name__ == "__main__":
         mode, frequency = find_mode(da)
         print(f"Input: {da}\nMode : {mode}, Frequency: {frequency}\n")
 
+    print("\nincremental resize example 1")
+    print("----------------------------")
+    m = HashMap(53, hash_function_1, incremental=True)
+    capacity = m.get_capacity()
+    for i in range(capacity):
+        m.put('str' + str(i), i)
+    for i in range(capacity, capacity + 7):
+        m.put('str' + str(i), i)
+        migrating = m._old_buckets is not None
+        print(m.get_size(), m.get_capacity(), migrating, m.get('str0'), m.get('str' + str(i)))
+
+    print("\nput_many / get_many example 1")
+    print("-----------------------------")
+    m = HashMap(11, hash_function_2)
+    m.put_many(('key' + str(i), i * 10) for i in range(20))
+    print(m.get_size(), m.get_capacity())
+    print(m.get_many(['key3', 'key19', 'key20']))
+    print(m.contains_many(DynamicArray(['key0', 'key20'])))
+    m.remove_many('key' + str(i) for i in range(0, 20, 2))
+    print(m.get_size(), m.get_many(['key2', 'key3']))
+
+    print("\ndump / load example 1")
+    print("---------------------")
+    import io
+    m = HashMap(11, hash_function_1)
+    for i in range(30):
+        m.put('key' + str(i), i * 3)
+    m.remove('key5')
+    for layout in (False, True):
+        snapshot = io.BytesIO()
+        m.dump(snapshot, layout=layout)
+        snapshot.seek(0)
+        loaded = HashMap.load(snapshot)
+        print(layout, loaded.get_size(), loaded.get_capacity(), loaded.get('key7'), loaded.contains_key('key5'),
+              dict(loaded.items()) == dict(m.items()))
+
+    print("\nput_many workers example 1")
+    print("--------------------------")
+    pairs = [('key' + str(i), i) for i in range(100000)]
+    m = HashMap(11, hash_function_2)
+    m.put_many(pairs, workers=2)
+    print(m.get_size(), m.get('key4321'), m.contains_key('key100000'))
@@ -0,0 +1,696 @@
+# Description: Sharded HashMap in shared memory for use by several processes. Keys are split across shards by the
+#              top bits of their mixed hash. Each shard is a multiprocessing.shared_memory segment in the
+#              hash_map_mmap table layout (power-of-two capacity, triangular probing on mixed hashes) with spare
+#              heap space for new records, so a shard segment is also a valid MappedHashMap file.
+#              Writers take the shard's lock. Readers take no lock: every shard has a sequence number that
+#              writers make odd while they change the shard, and a reader retries if the number was odd or
+#              changed during its lookup. A shard that runs out of slots or heap is rebuilt in a new segment,
+#              and every process switches to it on its next access.
+
+
+import os
+import struct
+import time
+import multiprocessing
+from multiprocessing import shared_memory
+from collections.abc import MutableMapping
+
+from base_include import (DynamicArray, encode_value, decode_value, mix_hash, get_hash_function,
+                        hash_function_id, resolve_hash_function)
+from hash_map_mmap import HEADER, MAGIC, VERSION, FLAG_POWER_OF_TWO, table_offsets
+from hash_map_oa import EMPTY, LIVE, TOMBSTONE
+
+CONTROL_MAGIC = b'HMSH'
+
+# magic, version, number of shards
+CONTROL_HEADER = struct.Struct('<4sHHQ')
+
+# sequence number, segment generation, end of the used heap, tombstones
+SHARD_STATE = struct.Struct('<QQQQ')
+
+_U32 = struct.Struct('<I')
+_U64 = struct.Struct('<Q')
+
+# SHARD_STATE without its leading sequence number.
+_STATE_FIELDS = struct.Struct('<QQQ')
+
+# Smallest shard capacity and heap.
+MIN_SHARD_CAPACITY = 8
+MIN_SHARD_HEAP = 4096
+
+# Lock-free read attempts before a reader takes the shard lock, and the longest pause between attempts.
+READ_ATTEMPTS = 12
+READ_MAX_BACKOFF = 0.001
+
+
+def _unlink_segment(name: str) -> None:
+    """
+    Remove a shared memory segment by name.
+    """
+    segment = shared_memory.SharedMemory(name)
+    segment.close()
+    segment.unlink()
+
+
+class SharedHashMap(MutableMapping):
+    """
+    Open addressing HashMap split into shards that live in shared memory.
+    Create it in one process and pass it to others when they start (as a multiprocessing.Process or
+    pool initializer argument); every process can then read and write every shard.
+    Supports put, get, contains_key, remove, get_size, get_capacity, get_keys_and_values, clear and
+    the mapping protocol. The creating process calls unlink() once the map is no longer needed; segments
+    it leaves behind are removed by its resource tracker when it and the processes it started have exited.
+    """
+
+    def __init__(self, capacity: int, function, shards: int = 8, seed: int = None, name: str = None,
+                 context=None) -> None:
+        """
+        Initialize new SharedHashMap with the given total capacity spread over shards. The number of
+        shards and the capacity of each shard are rounded up to powers of two. function must be a
+        registered hash function or its name, so other processes can rebuild it. name prefixes the
+        shared memory segment names and defaults to a random one.
+        context is the multiprocessing context the shard locks are made in, and must be the one the
+        other processes are started from.
+        """
+        self._hash_function = resolve_hash_function(function, seed)
+
+        # Other processes rebuild the hash function from its registry id, so it must have one.
+        hash_function_id(self._hash_function)
+
+        self._shards = 1 << max(shards - 1, 0).bit_length()
+        self._name = name or 'hm_' + os.urandom(6).hex()
+        self._locks = [(context or multiprocessing).Lock() for _ in range(self._shards)]
+        self._attach()
+
+        CONTROL_HEADER.pack_into(self._control.buf, 0, CONTROL_MAGIC, VERSION, 0, self._shards)
+
+        # Shards probe with a bitmask and triangular numbers, so their capacity must be a power of two.
+        shard_capacity = 1 << (max(capacity // self._shards, MIN_SHARD_CAPACITY) - 1).bit_length()
+        for shard in range(self._shards):
+            self._build_shard(shard, 0, shard_capacity, MIN_SHARD_HEAP, [])
+
+    def __getstate__(self) -> dict:
+        """
+        Return what another process needs to attach: the segment names, the hash function id and the locks.
+        """
+        return {'name': self._name, 'shards': self._shards, 'locks': self._locks,
+                'function': hash_function_id(self._hash_function)}
+
+    def __setstate__(self, state: dict) -> None:
+        """
+        Attach to the segments of a map created in another process.
+        """
+        self._name, self._shards, self._locks = state['name'], state['shards'], state['locks']
+        self._hash_function = get_hash_function(*state['function'])
+        self._attach(create=False)
+
+    def __str__(self) -> str:
+        """
+        Override string method to provide more readable output
+        """
+        out = ''
+        for shard in range(self._shards):
+            out += 'shard ' + str(shard) + ': ' + str(self._shard_items(shard)) + '\n'
+        return out
+
+    def get_size(self) -> int:
+        """
+        Return size of map
+        """
+        return sum(self._header(shard)[4] for shard in range(self._shards))
+
+    def get_capacity(self) -> int:
+        """
+        Return capacity of map, summed over the shards
+        """
+        return sum(self._header(shard)[3] for shard in range(self._shards))
+
+    # ------------------------------------------------------------------ #
+
+
+    def put(self, key: str, value: object) -> None:
+        """
+        :param key: String that maps to an integer index of the HashMap.
+        :param value: Object to be added to the mapped location.
+
+        Updates key-value pair in the hash map. If key is not in the hash map, adds new key-value pair.
+        A shard is rebuilt in a new segment when live entries plus tombstones reach half its capacity,
+        or when its heap has no room for the new records.
+        """
+
+        hash_value = mix_hash(self._hash_function(key))
+        shard = hash_value >> self._shift
+        key_data, value_data = encode_value(key), encode_value(value)
+
+        with self._locks[shard]:
+            while not self._put(shard, key, hash_value, key_data, value_data):
+                self._rebuild_shard(shard, 2 * (_U32.size * 2 + len(key_data) + len(value_data)))
+
+
+    def get(self, key: str, default: object = None) -> object:
+        """
+        :param key: String that maps to an integer index of the HashMap.
+        :param default: Object returned when key is not in the hash map.
+        :return: Object paired to key.
+
+        Returns the value associated with the given key, without taking a lock.
+        If the key is not in the hash map, the method returns default (None unless given).
+        """
+
+        return self._read(key, default)
+
+
+    def contains_key(self, key: str) -> bool:
+        """
+        :param key: String that maps to an integer index of the HashMap.
+        :return: True if key is in HashMap. False otherwise.
+
+        Returns True if the given key is in the hash map, otherwise it returns False.
+        """
+
+        return self._read(key, self) is not self
+
+
+    def remove(self, key: str) -> None:
+        """
+        :param key: String that maps to an integer index of the HashMap.
+
+        Removes given key and its associated value from the hash map.
+        If the key is not in the hash map, the method does nothing.
+        """
+
+        self._remove(key)
+
+
+    def get_keys_and_values(self) -> DynamicArray:
+        """
+        :return: Dynamic array of key-value pairs.
+
+        Returns a dynamic array where each index contains a tuple of a key-value pair from the hash map.
+        """
+
+        contents_da = DynamicArray()
+
+        for shard in range(self._shards):
+            for pair in self._shard_items(shard):
+                contents_da.append(pair)
+
+        return contents_da
+
+
+    def clear(self) -> None:
+        """
+        Clears the contents of the hash map without changing the shard capacities.
+        """
+
+        for shard in range(self._shards):
+            with self._locks[shard]:
+                capacity = self._header(shard)[3]
+                self._replace_shard(shard, capacity, MIN_SHARD_HEAP, [])
+
+
+    def close(self) -> None:
+        """
+        Detaches this process from the shared memory segments. The map cannot be used afterwards.
+        """
+
+        for segment in self._segments:
+            if segment is not None:
+                segment.close()
+        self._control.close()
+
+
+    def unlink(self) -> None:
+        """
+        Detaches and removes every shared memory segment of the map, in all processes.
+        """
+
+        names = [self._segment_name(shard, self._state(shard)[1]) for shard in range(self._shards)]
+        self.close()
+
+        for name in names + [self._name]:
+            _unlink_segment(name)
+
+
+    # ---------------------- Mapping protocol ---------------------- #
+
+    def __getitem__(self, key: str) -> object:
+        """
+        Returns the value paired to key using [] syntax. Raises KeyError if key is not in the hash map.
+        """
+
+        value = self._read(key, self)
+
+        if value is self:
+            raise KeyError(key)
+
+        return value
+
+
+    def __setitem__(self, key: str, value: object) -> None:
+        """
+        Adds or updates key-value pair using [] syntax.
+        """
+
+        self.put(key, value)
+
+
+    def __delitem__(self, key: str) -> None:
+        """
+        Removes key using del syntax. Raises KeyError if key is not in the hash map.
+        """
+
+        if not self._remove(key):
+            raise KeyError(key)
+
+
+    def __contains__(self, key: str) -> bool:
+        """
+        Returns True if key is in the hash map, for use with the in operator.
+        """
+
+        return self._read(key, self) is not self
+
+
+    def __len__(self) -> int:
+        """
+        Returns the number of key-value pairs in the hash map.
+        """
+
+        return self.get_size()
+
+
+    def __iter__(self):
+        """
+        Returns an iterator over the keys in the hash map. Each shard's keys are copied under its lock
+        when the iterator reaches it.
+        """
+
+        for shard in range(self._shards):
+            for key, value in self._shard_items(shard):
+                yield key
+
+
+    # ---------------------- Shard access ---------------------- #
+
+    def _attach(self, create: bool = True) -> None:
+        """
+        Creates or attaches the control segment. Shard segments are attached lazily by _buffer.
+        """
+
+        self._shift = 64 - (self._shards.bit_length() - 1)
+        size = CONTROL_HEADER.size + SHARD_STATE.size * self._shards
+        self._control = shared_memory.SharedMemory(self._name, create, size)
+        self._segments = [None] * self._shards
+        self._generations = [None] * self._shards
+
+
+    def _segment_name(self, shard: int, generation: int) -> str:
+        """
+        Returns the name of a shard's segment for the given generation.
+        """
+
+        return self._name + '_' + str(shard) + '_' + str(generation)
+
+
+    def _state(self, shard: int) -> tuple:
+        """
+        Returns the shard's (sequence number, generation, heap end, tombstones) from the control segment.
+        """
+
+        return SHARD_STATE.unpack_from(self._control.buf, CONTROL_HEADER.size + SHARD_STATE.size * shard)
+
+
+    def _set_state(self, shard: int, sequence: int, generation: int, heap_end: int, tombstones: int) -> None:
+        """
+        Writes the shard's entry in the control segment. The sequence number is written last, so a reader
+        that sees it unchanged after its lookup also saw the generation that goes with it.
+        """
+
+        offset = CONTROL_HEADER.size + SHARD_STATE.size * shard
+        _STATE_FIELDS.pack_into(self._control.buf, offset + _U64.size, generation, heap_end, tombstones)
+        _U64.pack_into(self._control.buf, offset, sequence)
+
+
+    def _buffer(self, shard: int, generation: int) -> memoryview:
+        """
+        Returns the buffer of the shard's segment for generation, attaching it if this process is still
+        on an older one.
+        """
+
+        if self._generations[shard] != generation:
+            if self._segments[shard] is not None:
+                self._segments[shard].close()
+
+            self._segments[shard] = self._generations[shard] = None
+            self._segments[shard] = shared_memory.SharedMemory(self._segment_name(shard, generation))
+            self._generations[shard] = generation
+
+        return self._segments[shard].buf
+
+
+    def _header(self, shard: int) -> tuple:
+        """
+        Returns the table header of the shard's current segment.
+        """
+
+        while True:
+            sequence, generation = self._state(shard)[:2]
+
+            try:
+                header = HEADER.unpack_from(self._buffer(shard, generation), 0)
+            except FileNotFoundError:
+                header = None
+
+            if sequence & 1 == 0 and self._state(shard)[0] == sequence and header is not None:
+                return header
+
+
+    def _read(self, key: str, default: object) -> object:
+        """
+        :param key: String that maps to an integer index of the HashMap.
+        :param default: Object returned when key is not in the hash map.
+        :return: Object paired to key.
+
+        Looks key up without a lock, retrying while a writer changes the shard. Retries yield and then
+        back off exponentially, so a preempted writer gets to finish. After READ_ATTEMPTS attempts the
+        lookup is done under the shard's lock instead.
+        """
+
+        hash_value = mix_hash(self._hash_function(key))
+        shard = hash_value >> self._shift
+
+        for attempt in range(READ_ATTEMPTS):
+            # Yield on the first retry, then sleep 4, 8, 16 ... microseconds up to READ_MAX_BACKOFF.
+            if attempt:
+                time.sleep(0 if attempt == 1 else min(READ_MAX_BACKOFF, 2 ** attempt / 1000000))
+
+            sequence, generation = self._state(shard)[:2]
+
+            if sequence & 1:
+                continue
+
+            # A torn read can only fail while the sequence number moves, and is then retried.
+            try:
+                buffer = self._buffer(shard, generation)
+                index = self._find(buffer, key, hash_value)
+                value = default if index is None else self._read_slot(buffer, 3, index)
+            except Exception:
+                if self._state(shard)[0] == sequence:
+                    raise
+                continue
+
+            if self._state(shard)[0] == sequence:
+                return value
+
+        # Writers kept the shard busy; read it the way a writer would.
+        with self._locks[shard]:
+            buffer = self._buffer(shard, self._state(shard)[1])
+            index = self._find(buffer, key, hash_value)
+            return default if index is None else self._read_slot(buffer, 3, index)
+
+
+    def _find(self, buffer: memoryview, key: str, hash_value: int) -> int:
+        """
+        :param buffer: Shard segment buffer.
+        :param key: String that maps to an integer index of the HashMap.
+        :param hash_value: Mixed hash of key.
+        :return: Integer index associated with key, or None.
+
+        Probes the shard with triangular numbers. Cached hashes are compared before keys.
+        """
+
+        capacity, max_probe = HEADER.unpack_from(buffer, 0)[3:6:2]
+        states, hashes = table_offsets(capacity)[:2]
+        mask = capacity - 1
+        initial_index = hash_value & mask
+
+        for num in range(max_probe):
+            index = (initial_index + ((num * num + num) >> 1)) & mask
+            state = buffer[states + index]
+
+            if state == EMPTY:
+                return None
+
+            if state == LIVE and _U64.unpack_from(buffer, hashes + 8 * index)[0] == hash_value:
+                if self._read_slot(buffer, 2, index) == key:
+                    return index
+
+        return None
+
+
+    def _read_slot(self, buffer: memoryview, array: int, index: int) -> object:
+        """
+        :param buffer: Shard segment buffer.
+        :param array: 2 for the key offsets array, 3 for the value offsets array.
+        :param index: Slot index.
+        :return: Decoded key or value stored for the slot.
+        """
+
+        offsets = table_offsets(HEADER.unpack_from(buffer, 0)[3])
+        start = offsets[4] + _U64.unpack_from(buffer, offsets[array] + 8 * index)[0]
+        length = _U32.unpack_from(buffer, start)[0]
+        start += _U32.size
+
+        with buffer[start:start + length] as record:
+            return decode_value(record)
+
+
+    def _shard_items(self, shard: int) -> list:
+        """
+        Returns a list of the shard's (key, value) pairs, read under the shard's lock.
+        """
+
+        with self._locks[shard]:
+            buffer = self._buffer(shard, self._state(shard)[1])
+            capacity = HEADER.unpack_from(buffer, 0)[3]
+            states = table_offsets(capacity)[0]
+
+            return [(self._read_slot(buffer, 2, index), self._read_slot(buffer, 3, index))
+                    for index in range(capacity) if buffer[states + index] == LIVE]
+
+
+    # ---------------------- Shard writes ---------------------- #
+
+    def _put(self, shard: int, key: str, hash_value: int, key_data: bytes, value_data: bytes) -> bool:
+        """
+        :return: False if the shard must be rebuilt before the key fits. True once the put is done.
+
+        Performs put on a shard whose lock is held. New records are appended to the heap before the slot
+        points at them.
+        """
+
+        sequence, generation, heap_end, tombstones = self._state(shard)
+        buffer = self._buffer(shard, generation)
+        magic, version, flags, capacity, size, max_probe, name_offset, seed_offset = HEADER.unpack_from(buffer, 0)
+        states, hashes, keys, values, heap = table_offsets(capacity)
+
+        index = self._find(buffer, key, hash_value)
+        needed = _U32.size + len(value_data) + (0 if index is not None else _U32.size + len(key_data))
+
+        if heap + heap_end + needed > len(buffer):
+            return False
+
+        if index is None:
+            if (size + tombstones) / capacity >= 0.5:
+                return False
+
+            # Take the first empty slot or tombstone of the probe sequence.
+            mask = capacity - 1
+            for num in range(capacity):
+                index = ((hash_value & mask) + ((num * num + num) >> 1)) & mask
+                if buffer[states + index] != LIVE:
+                    break
+            else:
+                return False
+
+        self._set_state(shard, sequence + 1, generation, heap_end, tombstones)
+
+        if buffer[states + index] != LIVE:
+            if buffer[states + index] == TOMBSTONE:
+                tombstones -= 1
+
+            _U64.pack_into(buffer, hashes + 8 * index, hash_value)
+            _U64.pack_into(buffer, keys + 8 * index, heap_end)
+            heap_end = self._write_record(buffer, heap + heap_end, key_data) - heap
+            HEADER.pack_into(buffer, 0, magic, version, flags, capacity, size + 1,
+                             max(max_probe, num + 1), name_offset, seed_offset)
+
+        _U64.pack_into(buffer, values + 8 * index, heap_end)
+        heap_end = self._write_record(buffer, heap + heap_end, value_data) - heap
+        buffer[states + index] = LIVE
+
+        self._set_state(shard, sequence + 2, generation, heap_end, tombstones)
+        return True
+
+
+    def _remove(self, key: str) -> bool:
+        """
+        :param key: String that maps to an integer index of the HashMap.
+        :return: True if key was removed. False if key was not in the hash map.
+
+        Turns the key's slot into a tombstone under the shard's lock.
+        """
+
+        hash_value = mix_hash(self._hash_function(key))
+        shard = hash_value >> self._shift
+
+        with self._locks[shard]:
+            sequence, generation, heap_end, tombstones = self._state(shard)
+            buffer = self._buffer(shard, generation)
+            index = self._find(buffer, key, hash_value)
+
+            if index is None:
+                return False
+
+            header = list(HEADER.unpack_from(buffer, 0))
+            header[4] -= 1
+
+            self._set_state(shard, sequence + 1, generation, heap_end, tombstones)
+            buffer[table_offsets(header[3])[0] + index] = TOMBSTONE
+            HEADER.pack_into(buffer, 0, *header)
+            self._set_state(shard, sequence + 2, generation, heap_end, tombstones + 1)
+            return True
+
+
+    def _rebuild_shard(self, shard: int, extra_heap: int) -> None:
+        """
+        :param shard: Shard whose lock is held.
+        :param extra_heap: Heap bytes the pending put needs.
+
+        Rebuilds the shard in a new segment without tombstones or stale records. The capacity doubles
+        unless tombstones outnumber live entries, and stays a power of two. The heap is sized at twice
+        the live records.
+        """
+
+        sequence, generation, heap_end, tombstones = self._state(shard)
+        capacity, size = self._header(shard)[3:5]
+        capacity = 1 << (capacity - 1).bit_length()
+
+        if tombstones <= size:
+            capacity *= 2
+
+        items = self._shard_items_unlocked(shard)
+        heap_size = 2 * sum(_U32.size * 2 + len(key) + len(value) for hash_value, key, value in items)
+        self._replace_shard(shard, capacity, max(heap_size + extra_heap, MIN_SHARD_HEAP), items)
+
+
+    def _shard_items_unlocked(self, shard: int) -> list:
+        """
+        Returns the (mixed hash, encoded key, encoded value) of every live entry of a shard whose lock is held.
+        """
+
+        buffer = self._buffer(shard, self._state(shard)[1])
+        capacity = HEADER.unpack_from(buffer, 0)[3]
+        states, hashes, keys, values, heap = table_offsets(capacity)
+        items = []
+
+        def record(array: int, index: int) -> bytes:
+            start = heap + _U64.unpack_from(buffer, array + 8 * index)[0]
+            length = _U32.unpack_from(buffer, start)[0]
+            return bytes(buffer[start + _U32.size:start + _U32.size + length])
+
+        for index in range(capacity):
+            if buffer[states + index] == LIVE:
+                items.append((_U64.unpack_from(buffer, hashes + 8 * index)[0],
+                              record(keys, index), record(values, index)))
+
+        return items
+
+
+    def _replace_shard(self, shard: int, capacity: int, heap_size: int, items: list) -> None:
+        """
+        Builds the next generation of a shard whose lock is held, switches every process to it and
+        removes the old segment.
+        """
+
+        sequence, generation, heap_end, tombstones = self._state(shard)
+        old_name = self._segment_name(shard, generation)
+
+        self._set_state(shard, sequence + 1, generation, heap_end, tombstones)
+        self._build_shard(shard, generation + 1, capacity, heap_size, items, sequence + 2)
+        _unlink_segment(old_name)
+
+
+    def _build_shard(self, shard: int, generation: int, capacity: int, heap_size: int, items: list,
+                     sequence: int = 0) -> None:
+        """
+        :param items: List of (mixed hash, encoded key, encoded value) tuples with unique keys.
+
+        Creates a shard segment in the hash_map_mmap layout holding items, and makes it current.
+        """
+
+        states, hashes, keys, values, heap = table_offsets(capacity)
+        hash_name, hash_seed = hash_function_id(self._hash_function)
+        name_data, seed_data = encode_value(hash_name), encode_value(hash_seed)
+
+        segment = shared_memory.SharedMemory(self._segment_name(shard, generation), True,
+                                heap + heap_size + 2 * _U32.size + len(name_data) + len(seed_data))
+        buffer = segment.buf
+
+        position = self._write_record(buffer, heap, name_data)
+        position = self._write_record(buffer, position, seed_data)
+        mask, max_probe = capacity - 1, 0
+
+        for hash_value, key_data, value_data in items:
+            for num in range(capacity):
+                index = ((hash_value & mask) + ((num * num + num) >> 1)) & mask
+                if buffer[states + index] == EMPTY:
+                    break
+
+            buffer[states + index] = LIVE
+            _U64.pack_into(buffer, hashes + 8 * index, hash_value)
+            _U64.pack_into(buffer, keys + 8 * index, position - heap)
+            position = self._write_record(buffer, position, key_data)
+            _U64.pack_into(buffer, values + 8 * index, position - heap)
+            position = self._write_record(buffer, position, value_data)
+            max_probe = max(max_probe, num + 1)
+
+        HEADER.pack_into(buffer, 0, MAGIC, VERSION, FLAG_POWER_OF_TWO, capacity, len(items), max_probe,
+                         0, _U32.size + len(name_data))
+
+        if self._segments[shard] is not None:
+            self._segments[shard].close()
+        self._segments[shard], self._generations[shard] = segment, generation
+
+        self._set_state(shard, sequence, generation, position - heap, 0)
+
+
+    @staticmethod
+    def _write_record(buffer: memoryview, position: int, data: bytes) -> int:
+        """
+        Writes a length-prefixed record at position and returns the position after it.
+        """
+
+        _U32.pack_into(buffer, position, len(data))
+        position += _U32.size
+        buffer[position:position + len(data)] = data
+        return position + len(data)
+
+
+# ------------------- BASIC TESTING ---------------------------------------- #
+
+
+def _worker(hash_map: SharedHashMap, start: int) -> None:
+    """Writes a range of keys from a child process."""
+    for i in range(start, start + 500):
+        hash_map.put('str' + str(i), i * 100)
+    hash_map.close()
+
+
+if __name__ == "__main__":
+
+    print("\nSharedHashMap - processes example 1")
+    print("-----------------------------------")
+    m = SharedHashMap(64, 'fnv1a', shards=4)
+    workers = [multiprocessing.Process(target=_worker, args=(m, start)) for start in range(0, 2000, 500)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+
+    result = True
+    for i in range(2000):
+        result &= m.get('str' + str(i)) == i * 100
+    print(m.get_size(), result, 'str42' in m, m.get('str2000'))
+    m.unlink()
@@ -0,0 +1,560 @@
+# Description: Expiring HashMap. ExpiringHashMap stores its entries in a separate chaining or open addressing
+#              HashMap and keeps each entry's deadline on its SLNode or HashEntry record. Expired entries read
+#              as missing and are reclaimed lazily through the map's own remove (unlinked from their bucket in
+#              hash_map_sc, turned into tombstones in hash_map_oa). An optional hashed timer wheel reclaims
+#              entries nobody reads: every operation sweeps a bounded number of wheel slots whose time has
+#              passed, the same way an incremental resize moves a few buckets per operation.
+
+
+import time
+from collections.abc import MutableMapping
+
+from base_include import (HashMapKeysView, HashMapValuesView, HashMapItemsView, bucket_nodes,
+                        ITER_KEYS, ITER_VALUES, hash_function_1, hash_function_2)
+import hash_map_oa
+import hash_map_sc
+
+# Passed as put's ttl to use the map's default_ttl.
+DEFAULT_TTL = object()
+
+
+class TimerWheel:
+    """
+    Hashed timer wheel of records keyed by their deadline.
+    Slot (deadline // resolution) % slots holds a record until the wheel's time passes its deadline.
+    Each record keeps the tick it is filed under in wheel_tick, and a slot holds it at most once. A later
+    deadline leaves the record where it is, and sweeping its slot files it again further on. Only an
+    earlier deadline in another slot files a new copy, and the copy left behind is dropped when its slot
+    is swept.
+    Supported methods are: schedule, advance
+    """
+
+    def __init__(self, slots: int, resolution: float, now: float) -> None:
+        """
+        Initialize a wheel of slots lists, each covering resolution seconds, starting at time now.
+        """
+        self._slots = [[] for _ in range(slots)]
+        self._resolution = resolution
+        self._tick = int(now // resolution)
+
+    def schedule(self, record: object) -> None:
+        """
+        :param record: SLNode or HashEntry with a deadline.
+
+        Files the record in the slot of its deadline, or in the next slot to be swept if that time has
+        already been swept. Does nothing if the record is already filed at a tick that is not yet swept
+        and not past its deadline.
+        """
+
+        count = len(self._slots)
+        tick = max(int(record.deadline // self._resolution), self._tick)
+        filed = record.wheel_tick
+
+        if filed is not None and self._tick <= filed <= tick:
+            return
+
+        # The record is already held by that slot, only for another turn.
+        if filed is not None and filed % count == tick % count:
+            record.wheel_tick = tick
+            return
+
+        record.wheel_tick = tick
+        self._slots[tick % count].append(record)
+
+    def advance(self, now: float, max_slots: int) -> list:
+        """
+        :param now: Current time.
+        :param max_slots: Greatest number of slots to sweep.
+        :return: List of records whose deadline has passed.
+
+        Sweeps the slots whose time has fully passed, oldest first, up to max_slots of them.
+        """
+
+        slots, count = self._slots, len(self._slots)
+        end = int(now // self._resolution)
+        expired = []
+
+        # After a long pause one full turn covers every slot.
+        if end - self._tick > count:
+            self._tick = end - count
+
+        for _ in range(max_slots):
+            if self._tick >= end:
+                break
+
+            tick, position = self._tick, self._tick % count
+            kept, seen = [], set()
+
+            for record in slots[position]:
+                filed = record.wheel_tick
+
+                # Copies left behind by an earlier deadline, or already swept, are dropped.
+                if filed is None or filed % count != position or id(record) in seen:
+                    continue
+
+                seen.add(id(record))
+
+                # Due on a later turn of this slot.
+                if filed > tick:
+                    kept.append(record)
+                    continue
+
+                if record.deadline is None:
+                    record.wheel_tick = None
+                    continue
+
+                deadline_tick = int(record.deadline // self._resolution)
+
+                if deadline_tick <= tick:
+                    record.wheel_tick = None
+                    expired.append(record)
+                    continue
+
+                # The deadline moved later since the record was filed; file it at its deadline.
+                record.wheel_tick = deadline_tick
+
+                if deadline_tick % count == position:
+                    kept.append(record)
+                else:
+                    slots[deadline_tick % count].append(record)
+
+            slots[position] = kept
+            self._tick += 1
+
+        return expired
+
+
+class ExpiringHashMap(MutableMapping):
+    """
+    HashMap whose entries can expire, on top of hash_map_sc.HashMap or hash_map_oa.HashMap.
+    put takes a ttl in seconds (default_ttl when not given); a ttl of None never expires.
+    get, contains_key, [] and in treat an expired entry as missing and remove it. Iteration skips
+    expired entries without removing them. get_size and len count the entries that have not expired,
+    purging first once any entry may have expired; purge reclaims all expired entries at once.
+    Not thread-safe.
+    """
+
+    # Default number of timer wheel slots swept by each operation.
+    REAP_SLOTS = 4
+
+    def __init__(self,
+                 hash_map=None,
+                 default_ttl: float = None,
+                 reaper: bool = False,
+                 wheel_slots: int = 256,
+                 resolution: float = 1.0,
+                 clock: callable = time.monotonic) -> None:
+        """
+        Initialize a new empty expiring map stored in hash_map, an empty hash_map_sc.HashMap or
+        hash_map_oa.HashMap (a separate chaining HashMap with hash_function_1 by default).
+        If reaper is True, expired entries are also swept from a timer wheel of wheel_slots slots of
+        resolution seconds each. clock returns the current time in seconds.
+        """
+        if hash_map is None:
+            hash_map = hash_map_sc.HashMap(11, hash_function_1)
+
+        if isinstance(hash_map, hash_map_sc.HashMap):
+            self._find = hash_map._get_node_from_key
+        elif isinstance(hash_map, hash_map_oa.HashMap):
+            self._find = hash_map._get_entry_from_key
+        else:
+            raise TypeError('ExpiringHashMap stores entries in hash_map_sc.HashMap or hash_map_oa.HashMap')
+
+        if hash_map.get_size():
+            raise ValueError('ExpiringHashMap needs an empty hash map')
+
+        self._map = hash_map
+        self._hash_key = hash_map._hash_key
+        self._put_record = hash_map._put_record
+        self._default_ttl = default_ttl
+        self._clock = clock
+        self._wheel = TimerWheel(wheel_slots, resolution, clock()) if reaper else None
+
+        # No entry expires before this time (None if no entry has a deadline), so counting can skip purging.
+        self._earliest = None
+
+    def __str__(self) -> str:
+        """
+        Override string method to provide more readable output
+        """
+        out = ''
+        for key, value in self.items():
+            out += str(key) + ': ' + str(value) + '\n'
+        return out
+
+    def get_size(self) -> int:
+        """
+        Return number of entries that have not expired, purging expired entries first if there may be any
+        """
+        if self._earliest is not None and self._earliest <= self._clock():
+            self.purge()
+        return self._map.get_size()
+
+    # ------------------------------------------------------------------ #
+
+
+    def put(self, key: str, value: object, ttl: float = DEFAULT_TTL) -> None:
+        """
+        :param key: String that maps to an integer index of the HashMap.
+        :param value: Object to be added to the mapped location.
+        :param ttl: Seconds until the pair expires, or None to never expire. Defaults to default_ttl.
+
+        Updates or adds the key-value pair with a new deadline.
+        """
+
+        now = self._clock()
+        self._reap(now)
+
+        if ttl is DEFAULT_TTL:
+            ttl = self._default_ttl
+
+        # An open addressing put may reuse a tombstone's entry, so the deadline is always reset.
+        record = self._put_record(key, value, self._hash_key(key))
+        record.deadline = now + ttl if ttl is not None else None
+
+        if record.deadline is not None:
+            if self._earliest is None or record.deadline < self._earliest:
+                self._earliest = record.deadline
+
+            if self._wheel is not None:
+                self._wheel.schedule(record)
+
+
+    def get(self, key: str, default: object = None) -> object:
+        """
+        :param key: String that maps to an integer index of the HashMap.
+        :param default: Object returned when key is missing or expired.
+        :return: Object paired to key.
+
+        Returns the value associated with the given key. An expired entry is removed and default
+        (None unless given) is returned.
+        """
+
+        record = self._live_record(key)
+
+        if record is None:
+            return default
+
+        return record.value
+
+
+    def contains_key(self, key: str) -> bool:
+        """
+        :param key: String that maps to an integer index of the HashMap.
+        :return: True if key is in the map and has not expired. False otherwise.
+        """
+
+        return self._live_record(key) is not None
+
+
+    def ttl(self, key: str) -> float:
+        """
+        :param key: String that maps to an integer index of the HashMap.
+        :return: Seconds left before key expires, or None if it never expires.
+
+        Raises KeyError if key is missing or expired.
+        """
+
+        record = self._live_record(key)
+
+        if record is None:
+            raise KeyError(key)
+
+        if record.deadline is None:
+            return None
+
+        return record.deadline - self._clock()
+
+
+    def remove(self, key: str) -> None:
+        """
+        :param key: String that maps to an integer index of the HashMap.
+
+        Removes given key and its associated value from the map.
+        If the key is not in the map, the method does nothing.
+        """
+
+        self._reap(self._clock())
+        self._map._remove(key, self._hash_key(key))
+
+
+    def purge(self) -> int:
+        """
+        :return: Number of expired entries removed.
+
+        Removes every expired entry, walking the whole table.
+        """
+
+        now = self._clock()
+        expired, earliest = [], None
+
+        for record in self._records():
+            if record.deadline is None:
+                continue
+
+            if record.deadline <= now:
+                expired.append(record)
+            elif earliest is None or record.deadline < earliest:
+                earliest = record.deadline
+
+        for record in expired:
+            self._map._remove(record.key, record.hash)
+
+        self._earliest = earliest
+        return len(expired)
+
+
+    def reap(self, max_slots: int = None) -> int:
+        """
+        :param max_slots: Greatest number of timer wheel slots to sweep. Defaults to every slot that is due.
+        :return: Number of expired entries removed.
+
+        Sweeps the timer wheel now instead of waiting for later operations. Does nothing without a reaper.
+        """
+
+        if self._wheel is None:
+            return 0
+
+        if max_slots is None:
+            max_slots = len(self._wheel._slots)
+
+        return self._reap(self._clock(), max_slots)
+
+
+    def clear(self) -> None:
+        """
+        Clears the contents of the map without changing the underlying table capacity.
+        """
+
+        self._map.clear()
+        self._earliest = None
+
+        if self._wheel is not None:
+            self._wheel = TimerWheel(len(self._wheel._slots), self._wheel._resolution, self._clock())
+
+
+    # ---------------------- Mapping protocol ---------------------- #
+
+    def __getitem__(self, key: str) -> object:
+        """
+        Returns the value paired to key using [] syntax. Raises KeyError if key is missing or expired.
+        """
+
+        record = self._live_record(key)
+
+        if record is None:
+            raise KeyError(key)
+
+        return record.value
+
+
+    def __setitem__(self, key: str, value: object) -> None:
+        """
+        Adds or updates key-value pair with the default ttl using [] syntax.
+        """
+
+        self.put(key, value)
+
+
+    def __delitem__(self, key: str) -> None:
+        """
+        Removes key using del syntax. Raises KeyError if key is missing or expired.
+        """
+
+        if self._live_record(key) is None:
+            raise KeyError(key)
+
+        self._map._remove(key, self._hash_key(key))
+
+
+    def __contains__(self, key: str) -> bool:
+        """
+        Returns True if key is in the map and has not expired, for use with the in operator.
+        """
+
+        return self._live_record(key) is not None
+
+
+    def __len__(self) -> int:
+        """
+        Returns the number of entries that have not expired, the same entries iteration yields.
+        """
+
+        return self.get_size()
+
+
+    def __iter__(self):
+        """
+        Returns an iterator over the keys that have not expired.
+        """
+
+        return self._iterator(ITER_KEYS)
+
+
+    def keys(self) -> HashMapKeysView:
+        """
+        Returns a live view of the keys that have not expired.
+        """
+
+        return HashMapKeysView(self)
+
+
+    def values(self) -> HashMapValuesView:
+        """
+        Returns a live view of the values that have not expired.
+        """
+
+        return HashMapValuesView(self)
+
+
+    def items(self) -> HashMapItemsView:
+        """
+        Returns a live view of the (key, value) pairs that have not expired.
+        """
+
+        return HashMapItemsView(self)
+
+
+    def _iterator(self, kind: int):
+        """
+        :param kind: ITER_KEYS, ITER_VALUES or ITER_ITEMS.
+        :return: New iterator over the entries that have not expired when it starts.
+        """
+
+        now = self._clock()
+
+        for record in self._records():
+            if record.deadline is not None and record.deadline <= now:
+                continue
+
+            if kind == ITER_KEYS:
+                yield record.key
+            elif kind == ITER_VALUES:
+                yield record.value
+            else:
+                yield record.key, record.value
+
+
+    def _records(self):
+        """
+        :return: Generator over the hash map's live records.
+
+        Walks the bucket storage directly. Raises RuntimeError if keys are added or removed meanwhile.
+        """
+
+        hash_map = self._map
+        hash_map._finish_migration()
+        buckets, modcount = hash_map._buckets, hash_map._modcount
+        chaining = isinstance(hash_map, hash_map_sc.HashMap)
+
+        for index in range(buckets.length()):
+            if chaining:
+                records = bucket_nodes(buckets[index])
+            else:
+                hash_entry = buckets[index]
+                records = (hash_entry,) if hash_entry is not None and not hash_entry.is_tombstone else ()
+
+            for record in records:
+                yield record
+
+                if hash_map._modcount != modcount:
+                    raise RuntimeError("HashMap changed during iteration")
+
+
+    def _live_record(self, key: str) -> object:
+        """
+        :param key: String that maps to an integer index of the HashMap.
+        :return: Record of key, or None if key is missing or expired.
+
+        Removes the record if it has expired.
+        """
+
+        now = self._clock()
+        self._reap(now)
+
+        hash_value = self._hash_key(key)
+        record = self._find(key, hash_value)
+
+        if record is None:
+            return None
+
+        if record.deadline is not None and record.deadline <= now:
+            self._map._remove(key, hash_value)
+            return None
+
+        return record
+
+
+    def _reap(self, now: float, max_slots: int = None) -> int:
+        """
+        :param now: Current time.
+        :param max_slots: Greatest number of wheel slots to sweep. Defaults to REAP_SLOTS.
+        :return: Number of expired entries removed.
+
+        Sweeps due timer wheel slots and removes the entries that are still in the map and expired.
+        """
+
+        if self._wheel is None:
+            return 0
+
+        removed = 0
+
+        for record in self._wheel.advance(now, max_slots or self.REAP_SLOTS):
+
+            # The record may have been removed, given a new deadline or reused for another key since.
+            if record.deadline is None or record.deadline > now:
+                continue
+
+            if self._find(record.key, record.hash) is record:
+                self._map._remove(record.key, record.hash)
+                removed += 1
+
+        return removed
+
+
+# ------------------- BASIC TESTING ---------------------------------------- #
+
+
+if __name__ == "__main__":
+
+    class Clock:
+        """Manual clock for the examples."""
+        def __init__(self) -> None:
+            self.now = 0.0
+
+        def __call__(self) -> float:
+            return self.now
+
+    print("\nExpiringHashMap - lazy expiry example 1")
+    print("---------------------------------------")
+    clock = Clock()
+    m = ExpiringHashMap(default_ttl=10, clock=clock)
+    m.put('session', 'abc')
+    m.put('token', 'xyz', ttl=2)
+    m.put('config', 'on', ttl=None)
+    clock.now = 5
+    print(m.get('session'), m.get('token'), m.contains_key('config'), m.get_size())
+    clock.now = 20
+    print(m.get('session'), sorted(m), m.get_size(), m.purge(), m.get_size())
+
+    print("\nExpiringHashMap - open addressing example 1")
+    print("-------------------------------------------")
+    clock = Clock()
+    m = ExpiringHashMap(hash_map_oa.HashMap(11, hash_function_2), clock=clock)
+    for i in range(100):
+        m.put('str' + str(i), i, ttl=i % 10 + 1)
+    clock.now = 5.5
+    print(len(list(m)), m.get_size(), m.get('str9'), m.get('str4'), m.get_size())
+
+    print("\nExpiringHashMap - timer wheel example 1")
+    print("---------------------------------------")
+    clock = Clock()
+    m = ExpiringHashMap(reaper=True, wheel_slots=8, resolution=1.0, clock=clock)
+    for i in range(1000):
+        m.put('str' + str(i), i, ttl=i % 30 + 1)
+    for second in range(1, 35, 6):
+        clock.now = second
+        m.put('heartbeat', second)
+        # Entries still stored, expired or not: the reaper reclaims them without any reads.
+        print(second, m._map.get_size())
+    print(m.reap(), m._map.get_size(), len(m))